@@ -0,0 +1,198 @@
+# app/core/admission.py
+"""
+Admission control and load shedding.
+
+Requests are sorted into route classes (heavy aggregate/list reads, light
+single-item reads, writes). Each class has its own concurrency limit and a
+bounded wait queue, so a burst of expensive requests cannot take every
+database connection away from cheap ones. A request is rejected up front
+with 503 + Retry-After when the estimated queueing time exceeds the budget,
+and each client is rate limited by a token bucket (429 + Retry-After).
+Health checks, docs and static files bypass all of this.
+"""
+import asyncio
+import json
+import math
+import re
+import time
+from collections import deque
+from typing import Optional
+
+from app.core.config import settings
+
+EXEMPT_PATHS = re.compile(r"^/(health|sites/health|oral-histories/health|docs|redoc|openapi\.json|dashboard|uploads/.*)?$")
+HEAVY_PATHS = re.compile(
+    r"^/(stats|chart-data|cultural-insights|map-data|sync/?|sites/?|artefacts/?|oral-histories/?"
+    r"|sites/full|sites/search/?|sites/export/csv|jobs/?|telemetry/[^/]+/[^/]+)$"
+)
+SAFE_METHODS = {"GET", "HEAD"}
+
+# Token cost per request, by class
+REQUEST_COST = {"light": 1.0, "write": 2.0, "heavy": 5.0}
+
+
+def classify(method: str, path: str) -> Optional[str]:
+    """
+    Route class for a request, or None when it is exempt.
+    """
+    if method == "OPTIONS" or EXEMPT_PATHS.match(path):
+        return None
+    if method not in SAFE_METHODS:
+        return "write"
+    if HEAVY_PATHS.match(path):
+        return "heavy"
+    return "light"
+
+
+class Overloaded(Exception):
+    def __init__(self, retry_after: float):
+        self.retry_after = retry_after
+
+
+class ConcurrencyLimiter:
+    """
+    Counting semaphore with a bounded FIFO wait queue and an EWMA of service
+    time, used to estimate how long a new arrival would wait.
+    """
+
+    def __init__(self, limit: int, max_queue: int, budget: float):
+        self.limit = limit
+        self.max_queue = max_queue
+        self.budget = budget
+        self.active = 0
+        self.service_time = 0.05  # seconds, EWMA
+        self.rejected = 0
+        self._waiters: "deque[asyncio.Future]" = deque()
+
+    def estimated_wait(self) -> float:
+        return (len(self._waiters) + 1) / self.limit * self.service_time
+
+    async def acquire(self):
+        if self.active < self.limit and not self._waiters:
+            self.active += 1
+            return
+        estimate = self.estimated_wait()
+        if len(self._waiters) >= self.max_queue or estimate > self.budget:
+            self.rejected += 1
+            raise Overloaded(estimate)
+
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.append(future)
+        try:
+            await asyncio.wait({future}, timeout=self.budget)
+        except asyncio.CancelledError:
+            # Client went away; pass on a slot we may have just been handed
+            if future.done():
+                self.release()
+            else:
+                future.cancel()
+                self._waiters.remove(future)
+            raise
+        if not future.done():
+            # Deadline passed before a slot freed up
+            future.cancel()
+            self._waiters.remove(future)
+            self.rejected += 1
+            raise Overloaded(self.estimated_wait())
+        # release() handed its slot straight to us; self.active is unchanged
+
+    def release(self, elapsed: Optional[float] = None):
+        if elapsed is not None:
+            self.service_time += 0.2 * (elapsed - self.service_time)
+        while self._waiters:
+            future = self._waiters.popleft()
+            if not future.done():
+                future.set_result(None)
+                return
+        self.active -= 1
+
+
+class TokenBuckets:
+    """
+    Per-client token buckets refilled at `rate` tokens/s up to `burst`.
+    """
+
+    MAX_CLIENTS = 10_000
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self._buckets: dict[str, list[float]] = {}  # client -> [tokens, last refill]
+
+    def take(self, client: str, cost: float) -> float:
+        """
+        Spend `cost` tokens; returns 0 on success, else seconds until enough
+        tokens will be available.
+        """
+        now = time.monotonic()
+        bucket = self._buckets.get(client)
+        if bucket is None:
+            if len(self._buckets) >= self.MAX_CLIENTS:
+                self._prune(now)
+            bucket = self._buckets[client] = [self.burst, now]
+        tokens = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+        bucket[1] = now
+        if tokens >= cost:
+            bucket[0] = tokens - cost
+            return 0.0
+        bucket[0] = tokens
+        return (cost - tokens) / self.rate
+
+    def _prune(self, now: float):
+        # Buckets that have refilled completely carry no state worth keeping
+        idle = (self.burst / self.rate) if self.rate > 0 else 0
+        self._buckets = {c: b for c, b in self._buckets.items() if now - b[1] < idle}
+
+
+class AdmissionControlMiddleware:
+    """
+    Pure ASGI middleware applying rate limits and per-class concurrency limits.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        budget = settings.ADMISSION_QUEUE_BUDGET_SECONDS
+        self.limiters = {
+            "heavy": ConcurrencyLimiter(settings.ADMISSION_HEAVY_CONCURRENCY, settings.ADMISSION_HEAVY_QUEUE, budget),
+            "light": ConcurrencyLimiter(settings.ADMISSION_LIGHT_CONCURRENCY, settings.ADMISSION_LIGHT_QUEUE, budget),
+            "write": ConcurrencyLimiter(settings.ADMISSION_WRITE_CONCURRENCY, settings.ADMISSION_WRITE_QUEUE, budget),
+        }
+        self.buckets = TokenBuckets(settings.RATE_LIMIT_PER_SECOND, settings.RATE_LIMIT_BURST)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        route_class = classify(scope["method"], scope["path"])
+        if route_class is None:
+            return await self.app(scope, receive, send)
+
+        client = scope["client"][0] if scope.get("client") else "unknown"
+        wait = self.buckets.take(client, REQUEST_COST[route_class])
+        if wait:
+            return await self._reject(send, 429, "Rate limit exceeded", wait)
+
+        limiter = self.limiters[route_class]
+        try:
+            await limiter.acquire()
+        except Overloaded as e:
+            return await self._reject(send, 503, f"Server busy ({route_class} requests)", e.retry_after)
+
+        started = time.monotonic()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            limiter.release(time.monotonic() - started)
+
+    @staticmethod
+    async def _reject(send, status: int, detail: str, retry_after: float):
+        body = json.dumps({"detail": detail}).encode()
+        await send({
+            "type": "http.response.start",
+            "status": status,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(max(1, math.ceil(retry_after))).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
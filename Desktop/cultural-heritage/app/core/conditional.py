@@ -0,0 +1,93 @@
+# app/core/conditional.py
+"""
+Conditional GET support (ETag / Last-Modified -> 304 Not Modified).
+
+Handlers compute cheap validators (row counts, max timestamps) plus a
+per-collection version counter that every mutation in this process bumps,
+and skip loading and serializing the full payload when the client's copy
+is still current. Collection endpoints use the ETag only: deleting a row
+other than the newest leaves max(updated_at) unchanged, so Last-Modified
+cannot tell that a list changed. It is kept for single records.
+"""
+import hashlib
+import secrets
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Optional
+
+from fastapi import Request, Response
+
+# Distinguishes counters of this process from those of a previous run.
+_BOOT_ID = secrets.token_hex(4)
+
+
+class CollectionVersions:
+    """
+    In-process version counters, bumped whenever a collection is mutated.
+    """
+
+    def __init__(self):
+        self._versions: dict[str, int] = {}
+
+    def get(self, collection: str) -> int:
+        return self._versions.get(collection, 0)
+
+    def bump(self, collection: str):
+        self._versions[collection] = self._versions.get(collection, 0) + 1
+
+
+collection_versions = CollectionVersions()
+
+
+def _http_date(value: datetime) -> str:
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return format_datetime(value.astimezone(timezone.utc), usegmt=True)
+
+
+class Validators:
+    """
+    ETag / Last-Modified validators for one response.
+    """
+
+    def __init__(self, collection: str, *parts, last_modified: Optional[datetime] = None):
+        raw = "|".join(str(p) for p in (collection, _BOOT_ID, collection_versions.get(collection), *parts))
+        self.etag = f'W/"{hashlib.sha1(raw.encode()).hexdigest()[:20]}"'
+        self.last_modified = last_modified
+
+    @property
+    def headers(self) -> dict:
+        headers = {"ETag": self.etag, "Cache-Control": "no-cache"}
+        if self.last_modified is not None:
+            headers["Last-Modified"] = _http_date(self.last_modified)
+        return headers
+
+    def matches(self, request: Request) -> bool:
+        """
+        True when the client's cached copy is still current.
+        """
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match is not None:
+            # If-None-Match takes precedence; weak comparison per RFC 9110
+            tags = {t.strip().removeprefix("W/") for t in if_none_match.split(",")}
+            return "*" in tags or self.etag.removeprefix("W/") in tags
+
+        if_modified_since = request.headers.get("if-modified-since")
+        if if_modified_since and self.last_modified is not None:
+            try:
+                since = parsedate_to_datetime(if_modified_since)
+            except (TypeError, ValueError):
+                return False
+            if since.tzinfo is None:
+                since = since.replace(tzinfo=timezone.utc)
+            last_modified = self.last_modified
+            if last_modified.tzinfo is None:
+                last_modified = last_modified.replace(tzinfo=timezone.utc)
+            return last_modified.replace(microsecond=0) <= since
+        return False
+
+    def not_modified(self) -> Response:
+        return Response(status_code=304, headers=self.headers)
+
+    def apply(self, response: Response):
+        response.headers.update(self.headers)
@@ -3,6 +3,10 @@ Configuration settings for the Cultural Heritage project.
 This file defines database connection URLs and environment-level constants.
 """
 
+import secrets
+from typing import Optional
+
+from pydantic import model_validator
 from pydantic_settings import BaseSettings
 from functools import lru_cache
 
@@ -37,6 +41,23 @@ class Settings(BaseSettings):
             f"@{self.POSTGRES_HOST}:{self.POSTGRES_PORT}/{self.POSTGRES_DB}"
         )
 
+    # --------------------------------------------------------------------------
+    # PostgreSQL Read Replicas (optional)
+    # --------------------------------------------------------------------------
+    # Comma-separated async URLs, e.g.
+    # "postgresql+asyncpg://user:pw@127.0.0.1:5433/cultural_heritage"
+    POSTGRES_REPLICA_URLS: str = ""
+    REPLICA_MAX_LAG_SECONDS: float = 5.0          # replicas further behind are skipped
+    REPLICA_HEALTH_INTERVAL_SECONDS: float = 5.0  # how often replicas are probed
+    READ_YOUR_WRITES_SECONDS: float = 10.0        # pin a client to primary after a write
+
+    @property
+    def REPLICA_URLS(self) -> list[str]:
+        """
+        Parse the configured replica URLs into a list.
+        """
+        return [u.strip() for u in self.POSTGRES_REPLICA_URLS.split(",") if u.strip()]
+
     # --------------------------------------------------------------------------
     # MongoDB Configuration
     # --------------------------------------------------------------------------
@@ -55,11 +76,93 @@ class Settings(BaseSettings):
             return f"mongodb://{self.MONGO_USER}:{self.MONGO_PASSWORD}@{self.MONGO_HOST}:{self.MONGO_PORT}"
         return f"mongodb://{self.MONGO_HOST}:{self.MONGO_PORT}"
 
+    # --------------------------------------------------------------------------
+    # Delta Sync
+    # --------------------------------------------------------------------------
+    SYNC_TOMBSTONE_RETENTION_DAYS: int = 30  # older sync tokens get a full resync
+    SYNC_OVERLAP_SECONDS: int = 30           # re-send recent rows to cover in-flight commits
+
+    # --------------------------------------------------------------------------
+    # Background Jobs
+    # --------------------------------------------------------------------------
+    JOB_WORKERS: int = 2                     # jobs running at the same time
+    JOB_THREAD_WORKERS: int = 4              # threads for blocking steps inside jobs
+    JOB_PROCESS_WORKERS: int = 2             # processes for CPU-bound steps
+    JOB_QUEUE_MAX: int = 1000                # submissions beyond this get a 503
+    JOB_PROGRESS_FLUSH_SECONDS: float = 1.0  # how often running progress is saved
+    JOB_HEARTBEAT_TIMEOUT_SECONDS: float = 60.0  # running jobs not flushed for this long are failed
+
+    # --------------------------------------------------------------------------
+    # Admission Control / Load Shedding
+    # --------------------------------------------------------------------------
+    # heavy = aggregates and full lists, light = single-item reads, write = mutations
+    ADMISSION_HEAVY_CONCURRENCY: int = 4
+    ADMISSION_HEAVY_QUEUE: int = 16
+    ADMISSION_LIGHT_CONCURRENCY: int = 16
+    ADMISSION_LIGHT_QUEUE: int = 128
+    ADMISSION_WRITE_CONCURRENCY: int = 8
+    ADMISSION_WRITE_QUEUE: int = 32
+    ADMISSION_QUEUE_BUDGET_SECONDS: float = 2.0  # reject when expected wait is longer
+    RATE_LIMIT_PER_SECOND: float = 20.0          # per client IP (heavy requests cost 5)
+    RATE_LIMIT_BURST: float = 60.0
+    # Connections beyond the admitted requests (job workers, revocation sync,
+    # health checks). Each process opens up to POSTGRES_POOL_SIZE connections.
+    POSTGRES_POOL_EXTRA: int = 6
+    POSTGRES_POOL_TIMEOUT_SECONDS: float = 5.0
+
+    @property
+    def POSTGRES_POOL_SIZE(self) -> int:
+        """
+        One connection per admitted request plus POSTGRES_POOL_EXTRA, so
+        excess load queues (and is shed) in admission control, not the pool.
+        """
+        return (
+            self.ADMISSION_HEAVY_CONCURRENCY + self.ADMISSION_LIGHT_CONCURRENCY
+            + self.ADMISSION_WRITE_CONCURRENCY + self.POSTGRES_POOL_EXTRA
+        )
+
+    # --------------------------------------------------------------------------
+    # Authentication
+    # --------------------------------------------------------------------------
+    # Required unless DEBUG is on, where a random per-process key is used and
+    # every restart (or second worker) invalidates existing tokens.
+    SECRET_KEY: Optional[str] = None
+    SESSION_TOKEN_TTL_SECONDS: int = 8 * 60 * 60
+    SESSION_TOKEN_CACHE_SIZE: int = 4096   # recently verified tokens kept in memory
+    PASSWORD_HASH_WORKERS: int = 2         # threads running scrypt (16 MB each)
+    TOKEN_REVOCATION_SYNC_SECONDS: float = 5.0  # how soon other workers see a logout
+
+    # --------------------------------------------------------------------------
+    # Logging
+    # --------------------------------------------------------------------------
+    LOG_LEVEL: str = "INFO"
+    LOG_QUEUE_SIZE: int = 10_000  # records beyond this are dropped, not blocked on
+    # keep 1 in N INFO records per logger, e.g. LOG_SAMPLE_RATES='{"uvicorn.access": 10}'
+    LOG_SAMPLE_RATES: dict[str, int] = {"uvicorn.access": 10}
+
+    # --------------------------------------------------------------------------
+    # IoT Telemetry Store
+    # --------------------------------------------------------------------------
+    TELEMETRY_DIR: str = "telemetry"
+    TELEMETRY_SEGMENT_POINTS: int = 65_536  # points per series before a head is sealed (~18 h at 1 Hz)
+    TELEMETRY_BLOCK_SECONDS: int = 900      # blocks are cut at epoch-aligned 15 min boundaries...
+    TELEMETRY_BLOCK_POINTS: int = 4096      # ...or after this many points, whichever comes first
+    TELEMETRY_MAX_POINTS: int = 20_000      # raw points or buckets returned by one query
+    TELEMETRY_MAX_DECODE_POINTS: int = 200_000  # compressed points one downsampled query may decode
+
     # --------------------------------------------------------------------------
     # Misc Settings
     # --------------------------------------------------------------------------
     DEBUG: bool = True
 
+    @model_validator(mode="after")
+    def _require_secret_key(self):
+        if not self.SECRET_KEY:
+            if not self.DEBUG:
+                raise ValueError("SECRET_KEY must be set when DEBUG is off")
+            self.SECRET_KEY = secrets.token_urlsafe(32)
+        return self
+
 
 # Singleton settings instance for app-wide use
 @lru_cache()
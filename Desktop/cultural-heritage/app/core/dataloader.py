@@ -0,0 +1,52 @@
+# app/core/dataloader.py
+"""
+Minimal DataLoader: coalesces the individual load(key) calls made during one
+event-loop tick into a single batch lookup, and caches results for the
+lifetime of the loader (create one per request).
+"""
+import asyncio
+from typing import Any, Awaitable, Callable, Hashable, Iterable
+
+
+class DataLoader:
+    def __init__(self, batch_fn: Callable[[list], Awaitable[dict]], default: Callable[[], Any] = list):
+        """
+        batch_fn receives the unique pending keys and returns {key: value};
+        keys missing from the result resolve to default().
+        """
+        self.batch_fn = batch_fn
+        self.default = default
+        self._cache: dict[Hashable, asyncio.Future] = {}
+        self._pending: list = []
+
+    def load(self, key: Hashable) -> asyncio.Future:
+        future = self._cache.get(key)
+        if future is not None:
+            return future
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._cache[key] = future
+        if not self._pending:
+            # First key of this tick: dispatch once everyone queued so far has had a turn
+            loop.call_soon(lambda: asyncio.ensure_future(self._dispatch()))
+        self._pending.append(key)
+        return future
+
+    async def load_many(self, keys: Iterable[Hashable]) -> list:
+        return list(await asyncio.gather(*(self.load(k) for k in keys)))
+
+    async def _dispatch(self):
+        keys, self._pending = self._pending, []
+        try:
+            results = await self.batch_fn(keys)
+        except Exception as e:
+            # Fail every waiter and forget the keys so a later load() retries
+            for key in keys:
+                future = self._cache.pop(key)
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for key in keys:
+            future = self._cache[key]
+            if not future.done():
+                future.set_result(results.get(key, self.default()))
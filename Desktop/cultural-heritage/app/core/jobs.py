@@ -0,0 +1,363 @@
+# app/core/jobs.py
+"""
+In-process background jobs.
+
+Handlers are registered per job kind and run on a fixed number of asyncio
+workers pulling from a priority queue; blocking or CPU-heavy steps inside a
+handler go to a bounded thread pool (ctx.run_blocking) or process pool
+(ctx.run_cpu). Every job has a durable row in Postgres (background_jobs)
+with its status, progress and result, so clients can poll /jobs/{id}.
+
+The row is the source of truth when several server processes share the
+table. A worker claims a queued job with a conditional UPDATE, so a job that
+sits in more than one process's queue still runs once. While running, the
+owner's periodic progress flush doubles as a heartbeat and picks up
+cancellations requested through another process ("cancelling"). Jobs whose
+owner stops heartbeating are failed by whichever process notices first.
+"""
+import asyncio
+import itertools
+import logging
+import threading
+import uuid
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Optional
+
+from sqlalchemy import or_, update
+from sqlalchemy.future import select
+
+from app.core.config import settings
+from app.db.postgres import AsyncSessionLocal
+from app.models.job_model import Job
+
+logger = logging.getLogger("jobs")
+
+FINISHED_STATUSES = {"succeeded", "failed", "cancelled"}
+ACTIVE_STATUSES = ("running", "cancelling")
+
+
+class JobCancelled(Exception):
+    """Raised inside a handler (via ctx.report / ctx.check_cancelled) once the job is cancelled."""
+
+
+class JobQueueFull(Exception):
+    pass
+
+
+class JobContext:
+    """
+    Handed to every job handler: progress reporting, cancellation checks and
+    access to the worker pools. report() and check_cancelled() are safe to
+    call from pool threads.
+    """
+
+    def __init__(self, manager: "JobManager", job_id: str):
+        self.job_id = job_id
+        self.progress = 0.0
+        self.message: Optional[str] = None
+        self._manager = manager
+        self._cancelled = threading.Event()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def check_cancelled(self):
+        if self._cancelled.is_set():
+            raise JobCancelled()
+
+    def report(self, progress: float, message: Optional[str] = None):
+        self.progress = min(max(progress, 0.0), 1.0)
+        if message is not None:
+            self.message = message
+        self.check_cancelled()
+
+    async def run_blocking(self, fn: Callable, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._manager.thread_pool, fn, *args)
+
+    async def run_cpu(self, fn: Callable, *args):
+        """
+        Run a picklable function in the process pool (no progress or
+        cancellation from inside the child process).
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._manager.process_pool, fn, *args)
+
+
+Handler = Callable[[JobContext, dict], Awaitable[Any]]
+
+
+class JobManager:
+    def __init__(self):
+        self._handlers: dict[str, Handler] = {}
+        self._queue: Optional[asyncio.PriorityQueue] = None
+        self._seq = itertools.count()
+        self._workers: list[asyncio.Task] = []
+        self._reaper: Optional[asyncio.Task] = None
+        self.boot_id = uuid.uuid4().hex
+        self._running: dict[str, tuple[JobContext, asyncio.Task]] = {}
+        # Queue slots promised to submit() calls still inserting their row
+        self._reserved = 0
+        self.thread_pool = ThreadPoolExecutor(
+            max_workers=settings.JOB_THREAD_WORKERS, thread_name_prefix="job"
+        )
+        self._process_pool: Optional[ProcessPoolExecutor] = None
+
+    @property
+    def process_pool(self) -> ProcessPoolExecutor:
+        if self._process_pool is None:
+            self._process_pool = ProcessPoolExecutor(max_workers=settings.JOB_PROCESS_WORKERS)
+        return self._process_pool
+
+    def handler(self, kind: str):
+        """
+        Register `async def fn(ctx, payload)` for a job kind.
+        """
+        def decorator(fn: Handler) -> Handler:
+            self._handlers[kind] = fn
+            return fn
+        return decorator
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+    async def _update(self, job_id: str, **fields):
+        async with AsyncSessionLocal() as session:
+            await session.execute(update(Job).where(Job.job_id == job_id).values(**fields))
+            await session.commit()
+
+    async def _claim(self, job_id: str) -> Optional[Job]:
+        """
+        Atomically move a queued job to running under this process; None if
+        it was cancelled or another process got there first.
+        """
+        now = datetime.now(timezone.utc)
+        async with AsyncSessionLocal() as session:
+            result = await session.execute(
+                update(Job)
+                .where(Job.job_id == job_id, Job.status == "queued")
+                .values(status="running", owner=self.boot_id, started_at=now, heartbeat_at=now)
+                .returning(Job.kind, Job.payload)
+            )
+            row = result.first()
+            await session.commit()
+        return row
+
+    async def _heartbeat(self, job_id: str, ctx: JobContext) -> Optional[str]:
+        """
+        Save live progress and return the job's status, which another
+        process may have set to "cancelling".
+        """
+        async with AsyncSessionLocal() as session:
+            result = await session.execute(
+                update(Job)
+                .where(Job.job_id == job_id)
+                .values(progress=ctx.progress, message=ctx.message, heartbeat_at=datetime.now(timezone.utc))
+                .returning(Job.status)
+            )
+            status = result.scalar()
+            await session.commit()
+        return status
+
+    async def _load(self, job_id: str) -> Optional[Job]:
+        async with AsyncSessionLocal() as session:
+            result = await session.execute(select(Job).where(Job.job_id == job_id))
+            return result.scalars().first()
+
+    async def _insert(self, kind: str, payload: Optional[dict], priority: int) -> Job:
+        job = Job(
+            job_id=uuid.uuid4().hex,
+            kind=kind,
+            status="queued",
+            priority=priority,
+            payload=payload or {},
+            progress=0.0,
+            created_at=datetime.now(timezone.utc),
+        )
+        async with AsyncSessionLocal() as session:
+            session.add(job)
+            await session.commit()
+        return job
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+    async def submit(self, kind: str, payload: Optional[dict] = None, *, priority: int = 5) -> dict:
+        if kind not in self._handlers:
+            raise ValueError(f"Unknown job kind '{kind}'")
+        if self._queue is None or 0 < self._queue.maxsize <= self._queue.qsize() + self._reserved:
+            raise JobQueueFull()
+
+        # Reserve the slot before awaiting the INSERT, so concurrent submits
+        # cannot fill the queue in between and strand a "queued" row
+        self._reserved += 1
+        try:
+            job = await self._insert(kind, payload, priority)
+            self._queue.put_nowait((priority, next(self._seq), job.job_id))
+        finally:
+            self._reserved -= 1
+        return job.to_dict()
+
+    async def get(self, job_id: str) -> Optional[Job]:
+        job = await self._load(job_id)
+        running = self._running.get(job_id)
+        if job is not None and running is not None:
+            # Live progress is fresher than the last flush to Postgres
+            ctx = running[0]
+            job.progress, job.message = ctx.progress, ctx.message
+        return job
+
+    async def cancel(self, job_id: str) -> bool:
+        """
+        Cancel a queued or running job; returns False if it already finished.
+        A job running in another process is marked "cancelling" and stopped
+        by its owner at the next progress flush.
+        """
+        running = self._running.get(job_id)
+        if running is not None:
+            ctx, task = running
+            ctx._cancelled.set()
+            task.cancel()
+            return True
+        async with AsyncSessionLocal() as session:
+            result = await session.execute(
+                update(Job)
+                .where(Job.job_id == job_id, Job.status == "queued")
+                .values(status="cancelled", finished_at=datetime.now(timezone.utc))
+            )
+            if not result.rowcount:
+                # Claimed in the meantime, or running elsewhere
+                result = await session.execute(
+                    update(Job)
+                    .where(Job.job_id == job_id, Job.status == "running")
+                    .values(status="cancelling")
+                )
+            await session.commit()
+        return result.rowcount > 0
+
+    # ------------------------------------------------------------------
+    # Workers
+    # ------------------------------------------------------------------
+    async def _run(self, job_id: str):
+        job = await self._claim(job_id)
+        if job is None:
+            return  # cancelled while queued, or run by another process
+        handler = self._handlers[job.kind]
+
+        ctx = JobContext(self, job_id)
+        task = asyncio.create_task(handler(ctx, job.payload or {}))
+        self._running[job_id] = (ctx, task)
+        try:
+            while True:
+                done, _ = await asyncio.wait({task}, timeout=settings.JOB_PROGRESS_FLUSH_SECONDS)
+                if done:
+                    break
+                if await self._heartbeat(job_id, ctx) == "cancelling" and not ctx.cancelled:
+                    ctx._cancelled.set()
+                    task.cancel()
+            result = task.result()
+            await self._update(
+                job_id, status="succeeded", progress=1.0, message=ctx.message,
+                result=result, finished_at=datetime.now(timezone.utc),
+            )
+        except (JobCancelled, asyncio.CancelledError):
+            if not ctx.cancelled:
+                raise  # the worker itself is being shut down
+            await self._update(
+                job_id, status="cancelled", progress=ctx.progress, finished_at=datetime.now(timezone.utc)
+            )
+        except Exception as e:
+            logger.error(f"❌ Job {job_id} ({job.kind}) failed: {e}")
+            await self._update(
+                job_id, status="failed", error=str(e), progress=ctx.progress,
+                finished_at=datetime.now(timezone.utc),
+            )
+        finally:
+            self._running.pop(job_id, None)
+
+    async def _worker(self):
+        while True:
+            _, _, job_id = await self._queue.get()
+            try:
+                await self._run(job_id)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"❌ Job worker error on {job_id}: {e}")
+            finally:
+                self._queue.task_done()
+
+    async def _reap(self):
+        """
+        Fail running jobs whose owner has stopped heartbeating (it crashed
+        or was restarted). Jobs owned by live processes are left alone.
+        """
+        now = datetime.now(timezone.utc)
+        stale = now - timedelta(seconds=settings.JOB_HEARTBEAT_TIMEOUT_SECONDS)
+        async with AsyncSessionLocal() as session:
+            result = await session.execute(
+                update(Job)
+                .where(Job.status.in_(ACTIVE_STATUSES), or_(Job.owner.is_(None), Job.owner != self.boot_id))
+                .where(or_(Job.heartbeat_at.is_(None), Job.heartbeat_at < stale))
+                .values(status="failed", error="Interrupted by restart", finished_at=now)
+            )
+            await session.commit()
+        if result.rowcount:
+            logger.warning(f"⚠️ Failed {result.rowcount} background job(s) whose worker stopped.")
+
+    async def _reap_loop(self):
+        while True:
+            await asyncio.sleep(settings.JOB_HEARTBEAT_TIMEOUT_SECONDS / 2)
+            try:
+                await self._reap()
+            except Exception as e:
+                logger.error(f"❌ Job reaper error: {e}")
+
+    async def _recover(self):
+        """
+        Fail jobs orphaned by a stopped process and queue the ones still
+        waiting. Other live processes may queue the same jobs; the claim in
+        _run makes sure each runs once.
+        """
+        await self._reap()
+        now = datetime.now(timezone.utc)
+        async with AsyncSessionLocal() as session:
+            result = await session.execute(
+                select(Job).where(Job.status == "queued").order_by(Job.priority, Job.created_at)
+            )
+            requeued = 0
+            for job in result.scalars().all():
+                if job.kind not in self._handlers:
+                    job.status, job.error, job.finished_at = "failed", f"Unknown job kind '{job.kind}'", now
+                elif not self._queue.full():
+                    self._queue.put_nowait((job.priority, next(self._seq), job.job_id))
+                    requeued += 1
+            await session.commit()
+        if requeued:
+            logger.info(f"🔁 Re-queued {requeued} background job(s).")
+
+    async def start(self):
+        self._queue = asyncio.PriorityQueue(maxsize=settings.JOB_QUEUE_MAX)
+        await self._recover()
+        self._workers = [asyncio.create_task(self._worker()) for _ in range(settings.JOB_WORKERS)]
+        self._reaper = asyncio.create_task(self._reap_loop())
+        logger.info(f"✅ Job workers started ({settings.JOB_WORKERS}).")
+
+    async def stop(self):
+        if self._reaper:
+            self._reaper.cancel()
+            self._reaper = None
+        for worker in self._workers:
+            worker.cancel()
+        for ctx, task in list(self._running.values()):
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        self.thread_pool.shutdown(wait=False, cancel_futures=True)
+        if self._process_pool is not None:
+            self._process_pool.shutdown(wait=False, cancel_futures=True)
+
+
+job_manager = JobManager()
@@ -1,9 +1,200 @@
 # app/core/logging_config.py
+"""
+Non-blocking structured logging.
+
+Log calls only build a record and push it onto a bounded queue; a
+QueueListener thread formats it as JSON and writes it to stdout. A slow
+stdout therefore never blocks the event loop: when the queue is full,
+records are dropped and counted instead. High-volume loggers can be sampled,
+and every record carries the id of the request that produced it.
+"""
+import atexit
+import contextvars
+import json
 import logging
+import logging.handlers
+import queue
+import secrets
+import sys
+from datetime import datetime, timezone
+from typing import Optional
+
+from app.core.config import settings
+
+# Id of the request being handled, set by RequestIdMiddleware
+request_id_var: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("request_id", default=None)
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_queue_handler: Optional["DroppingQueueHandler"] = None
+_sampler: Optional["SamplingFilter"] = None
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        request_id = getattr(record, "request_id", None)
+        if request_id:
+            entry["request_id"] = request_id
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class RequestIdFilter(logging.Filter):
+    """Stamps the current request id on records (runs in the caller's context)."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id_var.get()
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keeps 1 in N INFO/DEBUG records from configured loggers (and their
+    children); warnings and errors always pass.
+    """
+
+    def __init__(self, rates: dict[str, int]):
+        super().__init__()
+        self.rates = {name: n for name, n in rates.items() if n > 1}
+        self._counters: dict[str, int] = {}
+        self.sampled_out = 0
+
+    def _rate(self, name: str) -> int:
+        while name:
+            if name in self.rates:
+                return self.rates[name]
+            name = name.rpartition(".")[0]
+        return 1
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > logging.INFO or not self.rates:
+            return True
+        rate = self._rate(record.name)
+        if rate == 1:
+            return True
+        count = self._counters.get(record.name, 0)
+        self._counters[record.name] = count + 1
+        if count % rate == 0:
+            return True
+        self.sampled_out += 1
+        return False
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler over a bounded queue that drops (and counts) records instead
+    of blocking when the writer thread falls behind.
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Resolve args and traceback now; keep the exception out of the message
+        # so the JSON formatter can emit it as a separate field.
+        record = logging.makeLogRecord(record.__dict__)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
 
 def setup_logging():
-    fmt = "%(asctime)s [%(levelname)s] %(name)s: %(message)s"
-    logging.basicConfig(level=logging.INFO, format=fmt)
-    # reduce noise from some libraries if needed
-    logging.getLogger("uvicorn.access").setLevel(logging.WARNING)
+    global _listener, _queue_handler, _sampler
+    shutdown_logging()
+
+    stream = logging.StreamHandler(sys.stdout)
+    stream.setFormatter(JsonFormatter())
+
+    log_queue: queue.Queue = queue.Queue(maxsize=settings.LOG_QUEUE_SIZE)
+    _queue_handler = DroppingQueueHandler(log_queue)
+    _sampler = SamplingFilter(settings.LOG_SAMPLE_RATES)
+    _queue_handler.addFilter(_sampler)
+    _queue_handler.addFilter(RequestIdFilter())
+
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    root.addHandler(_queue_handler)
+    root.setLevel(settings.LOG_LEVEL)
+
+    # uvicorn installs its own (synchronous) stream handlers; route through ours
+    for name in ("uvicorn", "uvicorn.error", "uvicorn.access"):
+        uv_logger = logging.getLogger(name)
+        uv_logger.handlers = []
+        uv_logger.propagate = True
+
+    # reduce noise from some libraries if needed (access logs are sampled instead)
     logging.getLogger("asyncio").setLevel(logging.WARNING)
+
+    _listener = logging.handlers.QueueListener(log_queue, stream, respect_handler_level=True)
+    _listener.start()
+
+
+def shutdown_logging():
+    """
+    Flush queued records and stop the writer thread.
+    """
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def get_logging_stats() -> dict:
+    return {
+        "queued": _queue_handler.queue.qsize() if _queue_handler else 0,
+        "dropped": _queue_handler.dropped if _queue_handler else 0,
+        "sampled_out": _sampler.sampled_out if _sampler else 0,
+    }
+
+
+class RequestIdMiddleware:
+    """
+    Pure ASGI middleware: takes X-Request-ID from the client (or generates
+    one), exposes it to log records and echoes it in the response.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        request_id = None
+        for name, value in scope["headers"]:
+            if name == b"x-request-id":
+                request_id = value.decode("latin-1")[:64]
+                break
+        request_id = request_id or secrets.token_hex(8)
+        token = request_id_var.set(request_id)
+
+        async def send_with_id(message):
+            if message["type"] == "http.response.start":
+                message.setdefault("headers", [])
+                message["headers"] = list(message["headers"]) + [(b"x-request-id", request_id.encode())]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            request_id_var.reset(token)
+
+
+atexit.register(shutdown_logging)
@@ -0,0 +1,277 @@
+# app/core/security.py
+"""
+Password hashing and stateless session tokens.
+
+Passwords are hashed with scrypt on a small dedicated thread pool so a burst
+of logins cannot stall the event loop. Sessions are HMAC-signed tokens that
+carry their own claims and expiry; verifying one needs no database round trip.
+Logouts are recorded in the revoked_tokens table and every worker pulls new
+rows into memory every TOKEN_REVOCATION_SYNC_SECONDS, so a revoked token is
+rejected everywhere shortly after logout and stays rejected across restarts.
+"""
+import asyncio
+import base64
+import hashlib
+import hmac
+import json
+import logging
+import secrets
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from fastapi import HTTPException, Request
+from sqlalchemy import delete, select
+from sqlalchemy.dialects.postgresql import insert
+
+from app.core.config import settings
+from app.db.postgres import AsyncSessionLocal
+from app.models.revoked_token_model import RevokedToken
+
+logger = logging.getLogger("security")
+
+# --------------------------------------------------------------------------
+# Password hashing
+# --------------------------------------------------------------------------
+SCRYPT_N = 2 ** 14
+SCRYPT_R = 8
+SCRYPT_P = 1
+SCRYPT_DKLEN = 32
+
+_hash_pool = ThreadPoolExecutor(
+    max_workers=settings.PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash"
+)
+# A hash pinned for users that do not exist, so unknown usernames cost the same.
+_DUMMY_HASH: Optional[str] = None
+
+
+def _b64encode(raw: bytes) -> str:
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def _b64decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+
+def _scrypt(password: str, salt: bytes, n: int, r: int, p: int, dklen: int) -> bytes:
+    # scrypt needs 128 * n * r bytes; leave headroom over OpenSSL's 32 MB default cap.
+    return hashlib.scrypt(
+        password.encode(), salt=salt, n=n, r=r, p=p, dklen=dklen, maxmem=2 * 128 * n * r
+    )
+
+
+def _hash_password_sync(password: str) -> str:
+    salt = secrets.token_bytes(16)
+    digest = _scrypt(password, salt, SCRYPT_N, SCRYPT_R, SCRYPT_P, SCRYPT_DKLEN)
+    return f"scrypt${SCRYPT_N}${SCRYPT_R}${SCRYPT_P}${_b64encode(salt)}${_b64encode(digest)}"
+
+
+def _verify_password_sync(password: str, stored: str) -> bool:
+    if stored.startswith("scrypt$"):
+        try:
+            _, n, r, p, salt, digest = stored.split("$")
+            expected = _b64decode(digest)
+            actual = _scrypt(password, _b64decode(salt), int(n), int(r), int(p), len(expected))
+        except ValueError:
+            return False
+        return hmac.compare_digest(actual, expected)
+    # Legacy unsalted SHA-256 hex digests from before scrypt was introduced.
+    return hmac.compare_digest(hashlib.sha256(password.encode()).hexdigest(), stored)
+
+
+def needs_rehash(stored: str) -> bool:
+    """
+    True for hashes in the legacy format or with outdated scrypt parameters.
+    """
+    return not stored.startswith(f"scrypt${SCRYPT_N}${SCRYPT_R}${SCRYPT_P}$")
+
+
+async def hash_password(password: str) -> str:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_hash_pool, _hash_password_sync, password)
+
+
+async def verify_password(password: str, stored: Optional[str]) -> bool:
+    """
+    Check a password against a stored hash. Pass None for an unknown user to
+    spend the same time as a real check.
+    """
+    global _DUMMY_HASH
+    loop = asyncio.get_running_loop()
+    if stored is None:
+        if _DUMMY_HASH is None:
+            _DUMMY_HASH = await hash_password(secrets.token_hex(8))
+        await loop.run_in_executor(_hash_pool, _verify_password_sync, password, _DUMMY_HASH)
+        return False
+    return await loop.run_in_executor(_hash_pool, _verify_password_sync, password, stored)
+
+
+# --------------------------------------------------------------------------
+# Session tokens
+# --------------------------------------------------------------------------
+_SECRET = settings.SECRET_KEY.encode()
+REVOCATION_SYNC_OVERLAP = timedelta(minutes=1)
+
+
+def _sign(payload: bytes) -> str:
+    return _b64encode(hmac.new(_SECRET, payload, hashlib.sha256).digest())
+
+
+def create_session_token(user_id: int, username: str, is_admin: bool) -> tuple[str, int]:
+    """
+    Issue a signed token; returns (token, expiry as unix time).
+    """
+    expires_at = int(time.time()) + settings.SESSION_TOKEN_TTL_SECONDS
+    claims = {
+        "uid": user_id,
+        "sub": username,
+        "adm": bool(is_admin),
+        "exp": expires_at,
+        "jti": secrets.token_hex(8),
+    }
+    payload = _b64encode(json.dumps(claims, separators=(",", ":")).encode())
+    return f"{payload}.{_sign(payload.encode())}", expires_at
+
+
+class TokenVerifier:
+    """
+    Verifies session tokens, remembering recently verified ones in an LRU so
+    repeat requests skip the HMAC and JSON decode, and honouring revocations.
+    """
+
+    def __init__(self, cache_size: int):
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[str, dict]" = OrderedDict()
+        self._revoked: dict[str, int] = {}  # jti -> exp, kept until the token would expire anyway
+        self._synced_at: Optional[datetime] = None  # newest revoked_at already loaded
+        self._sync_task: Optional[asyncio.Task] = None
+
+    def _decode(self, token: str) -> Optional[dict]:
+        payload, _, signature = token.partition(".")
+        # Compare bytes: compare_digest rejects str arguments with non-ASCII characters
+        if not signature or not hmac.compare_digest(_sign(payload.encode()).encode(), signature.encode()):
+            return None
+        try:
+            claims = json.loads(_b64decode(payload))
+        except ValueError:
+            return None
+        return claims if isinstance(claims, dict) else None
+
+    def verify(self, token: str) -> Optional[dict]:
+        claims = self._cache.get(token)
+        if claims is None:
+            claims = self._decode(token)
+            if claims is None:
+                return None
+            self._cache[token] = claims
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        else:
+            self._cache.move_to_end(token)
+
+        if claims.get("exp", 0) <= time.time() or claims.get("jti") in self._revoked:
+            self._cache.pop(token, None)
+            return None
+        return claims
+
+    def _remember(self, jti: str, exp: int):
+        now = time.time()
+        if len(self._revoked) > self.cache_size:
+            self._revoked = {j: e for j, e in self._revoked.items() if e > now}
+        self._revoked[jti] = exp
+
+    async def revoke(self, claims: dict):
+        """
+        Reject the token here immediately and record it for the other workers.
+        """
+        self._remember(claims["jti"], claims["exp"])
+        async with AsyncSessionLocal() as session:
+            # Logging out again (possibly on another worker) is not an error
+            await session.execute(
+                insert(RevokedToken)
+                .values(jti=claims["jti"], expires_at=datetime.fromtimestamp(claims["exp"], tz=timezone.utc))
+                .on_conflict_do_nothing(index_elements=[RevokedToken.jti])
+            )
+            await session.commit()
+
+    async def sync(self):
+        """
+        Load revocations recorded since the last sync.
+        """
+        query = (
+            select(RevokedToken.jti, RevokedToken.expires_at, RevokedToken.revoked_at)
+            .where(RevokedToken.expires_at > datetime.now(timezone.utc))
+        )
+        if self._synced_at is not None:
+            # Overlap the previous sync: a logout whose transaction started
+            # earlier may commit after newer rows were already read.
+            query = query.where(RevokedToken.revoked_at > self._synced_at - REVOCATION_SYNC_OVERLAP)
+        async with AsyncSessionLocal() as session:
+            result = await session.execute(query)
+            for jti, expires_at, revoked_at in result.all():
+                self._remember(jti, int(expires_at.timestamp()))
+                if self._synced_at is None or revoked_at > self._synced_at:
+                    self._synced_at = revoked_at
+
+    async def _sync_loop(self):
+        while True:
+            await asyncio.sleep(settings.TOKEN_REVOCATION_SYNC_SECONDS)
+            try:
+                await self.sync()
+            except Exception as e:
+                logger.warning(f"⚠️ Token revocation sync failed: {e}")
+
+    async def start(self):
+        # Rows for tokens that have expired anyway are no longer needed
+        async with AsyncSessionLocal() as session:
+            await session.execute(
+                delete(RevokedToken).where(RevokedToken.expires_at <= datetime.now(timezone.utc))
+            )
+            await session.commit()
+        await self.sync()
+        self._sync_task = asyncio.create_task(self._sync_loop())
+        logger.info(f"✅ Loaded {len(self._revoked)} revoked session token(s).")
+
+    async def stop(self):
+        if self._sync_task:
+            self._sync_task.cancel()
+            self._sync_task = None
+
+
+token_verifier = TokenVerifier(settings.SESSION_TOKEN_CACHE_SIZE)
+
+
+class TokenAuthMiddleware:
+    """
+    Pure ASGI middleware that attaches verified token claims to
+    request.state.user (None when there is no valid bearer token).
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http":
+            user = None
+            for name, value in scope["headers"]:
+                if name == b"authorization":
+                    scheme, _, token = value.decode("latin-1").partition(" ")
+                    if scheme.lower() == "bearer" and token:
+                        user = token_verifier.verify(token.strip())
+                    break
+            scope.setdefault("state", {})["user"] = user
+        await self.app(scope, receive, send)
+
+
+# Dependencies for routes
+def get_current_user(request: Request) -> dict:
+    user = getattr(request.state, "user", None)
+    if user is None:
+        raise HTTPException(
+            status_code=401,
+            detail="Not authenticated",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return user
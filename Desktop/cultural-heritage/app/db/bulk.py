@@ -0,0 +1,72 @@
+# app/db/bulk.py
+"""
+Set-based UPDATE / DELETE helpers.
+
+Each operation is a single `UPDATE ... WHERE ... RETURNING` or
+`DELETE ... WHERE ... RETURNING` statement, so editing many rows costs one
+round trip instead of a SELECT + flush + refresh per row. Only whitelisted
+columns may be filtered on or written.
+"""
+from typing import Any, Iterable, Optional
+
+from sqlalchemy import delete, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+class BulkError(ValueError):
+    """Raised for selectors or updates that reference non-whitelisted fields."""
+
+
+def build_where(model, pk, ids: Optional[list], filters: Optional[dict], filterable: Iterable[str]):
+    """
+    Translate an id list and/or equality filters into WHERE clauses.
+    A list value in `filters` becomes an IN (...) test.
+    """
+    clauses = []
+    if ids is not None:
+        clauses.append(pk.in_(ids))
+    for field, value in (filters or {}).items():
+        if field not in filterable:
+            raise BulkError(f"Cannot filter on '{field}'")
+        column = getattr(model, field)
+        if isinstance(value, list):
+            clauses.append(column.in_(value))
+        elif value is None:
+            clauses.append(column.is_(None))
+        else:
+            clauses.append(column == value)
+    if not clauses:
+        # Never touch the whole table by accident
+        raise BulkError("Provide 'ids' or a non-empty 'filter'")
+    return clauses
+
+
+def clean_updates(updates: dict[str, Any], updatable: Iterable[str]) -> dict[str, Any]:
+    unknown = set(updates) - set(updatable)
+    if unknown:
+        raise BulkError(f"Cannot update field(s): {', '.join(sorted(unknown))}")
+    return dict(updates)
+
+
+async def bulk_update(session: AsyncSession, model, values: dict[str, Any], clauses) -> list:
+    """
+    UPDATE matching rows and return the updated ORM objects.
+    """
+    stmt = (
+        update(model)
+        .where(*clauses)
+        .values(**values)
+        .returning(model)
+        .execution_options(synchronize_session=False)
+    )
+    result = await session.execute(stmt)
+    return list(result.scalars().all())
+
+
+async def bulk_delete(session: AsyncSession, model, pk, clauses) -> list:
+    """
+    DELETE matching rows and return their primary keys.
+    """
+    stmt = delete(model).where(*clauses).returning(pk).execution_options(synchronize_session=False)
+    result = await session.execute(stmt)
+    return list(result.scalars().all())
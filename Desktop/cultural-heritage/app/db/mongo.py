@@ -23,6 +23,8 @@ async def init_mongo():
         # ping to ensure connection (motor command is async)
         await MONGO_CLIENT.admin.command("ping")
         logger.info("✅ MongoDB connected and ping succeeded.")
+        # region is the join key from sites to oral histories
+        await MONGO_DB["oral_histories"].create_index("region")
     except Exception as e:
         MONGO_CLIENT = None
         MONGO_DB = None
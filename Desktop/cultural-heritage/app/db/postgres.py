@@ -1,5 +1,15 @@
 # app/db/postgres.py
+import asyncio
+import itertools
 import logging
+import math
+import time
+from contextlib import asynccontextmanager
+from typing import Optional
+
+from fastapi import Request, Response
+from sqlalchemy import event, text
+from sqlalchemy.exc import DBAPIError, OperationalError
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker
 
@@ -14,12 +24,262 @@ DATABASE_URL = (
     f"{settings.POSTGRES_PORT}/{settings.POSTGRES_DB}"
 )
 
+# Pool sized from the admission limits (see Settings.POSTGRES_POOL_SIZE)
+POOL_OPTIONS = {
+    "pool_size": settings.POSTGRES_POOL_SIZE,
+    "max_overflow": 0,
+    "pool_timeout": settings.POSTGRES_POOL_TIMEOUT_SECONDS,
+}
+
 # Create async engine
-engine = create_async_engine(DATABASE_URL, echo=False, future=True)
+engine = create_async_engine(DATABASE_URL, echo=False, future=True, **POOL_OPTIONS)
 
 # Session factory
 AsyncSessionLocal = sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
 
+SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+# Idempotent DDL for databases created before a column/index was added to a
+# model (create_all only creates missing tables, it never alters them).
+SCHEMA_UPGRADES = [
+    "CREATE INDEX IF NOT EXISTS ix_heritage_artefacts_site_name ON heritage_artefacts (site_name)",
+    "ALTER TABLE heritage_artefacts ADD COLUMN IF NOT EXISTS created_at TIMESTAMPTZ DEFAULT now()",
+    "ALTER TABLE heritage_artefacts ADD COLUMN IF NOT EXISTS updated_at TIMESTAMPTZ DEFAULT now()",
+    "CREATE INDEX IF NOT EXISTS ix_heritage_artefacts_updated_at ON heritage_artefacts (updated_at)",
+    "CREATE INDEX IF NOT EXISTS ix_heritage_sites_changed_at ON heritage_sites (COALESCE(updated_at, created_at))",
+    "ALTER TABLE background_jobs ADD COLUMN IF NOT EXISTS owner VARCHAR(32)",
+    "ALTER TABLE background_jobs ADD COLUMN IF NOT EXISTS heartbeat_at TIMESTAMPTZ",
+]
+
+PRIMARY_LSN_SQL = text("SELECT pg_current_wal_lsn()::text")
+
+# Replication lag of a standby in seconds; NULL when it cannot be determined.
+# A standby is caught up (lag 0) once it has replayed the primary's current
+# WAL position. Without that position (primary unreachable), "replayed all
+# it received" only counts while the WAL receiver is streaming: a standby
+# that lost its stream replays what it has and then stops, with both LSNs
+# equal while its data goes stale.
+REPLICA_LAG_SQL = text(
+    """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN CAST(:primary_lsn AS text) IS NOT NULL
+             AND pg_last_wal_replay_lsn() >= CAST(CAST(:primary_lsn AS text) AS pg_lsn) THEN 0
+        WHEN CAST(:primary_lsn AS text) IS NULL
+             AND pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn()
+             AND EXISTS (SELECT 1 FROM pg_stat_wal_receiver WHERE status = 'streaming') THEN 0
+        ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())
+    END
+    """
+)
+
+
+def is_connection_failure(exc: BaseException) -> bool:
+    return (
+        isinstance(exc, (OperationalError, OSError))
+        or (isinstance(exc, DBAPIError) and exc.connection_invalidated)
+    )
+
+
+class ReplicaSession(AsyncSession):
+    """
+    Read-only session on a replica. If the replica connection fails, the
+    statement is retried on the primary and the rest of the session stays
+    there, so the request gets real data instead of an error.
+    """
+
+    def __init__(self, *args, replica: "Replica", **kwargs):
+        super().__init__(*args, **kwargs)
+        self.replica = replica
+        self._primary: Optional[AsyncSession] = None
+
+    async def _run(self, method: str, *args, **kwargs):
+        if self._primary is None:
+            try:
+                return await getattr(AsyncSession, method)(self, *args, **kwargs)
+            except Exception as e:
+                if not is_connection_failure(e):
+                    raise
+                self.replica.mark_failed(e)
+                try:
+                    await AsyncSession.rollback(self)
+                except Exception:
+                    pass  # the connection is already gone
+                self._primary = AsyncSessionLocal()
+        return await getattr(self._primary, method)(*args, **kwargs)
+
+    async def execute(self, *args, **kwargs):
+        return await self._run("execute", *args, **kwargs)
+
+    async def scalar(self, *args, **kwargs):
+        return await self._run("scalar", *args, **kwargs)
+
+    async def scalars(self, *args, **kwargs):
+        return await self._run("scalars", *args, **kwargs)
+
+    async def get(self, *args, **kwargs):
+        return await self._run("get", *args, **kwargs)
+
+    async def close(self):
+        if self._primary is not None:
+            await self._primary.close()
+            self._primary = None
+        await super().close()
+
+
+class Replica:
+    """
+    One read replica: its engine, session factory and last known health.
+    """
+
+    def __init__(self, url: str):
+        self.url = url
+        self.engine = create_async_engine(url, echo=False, future=True, **POOL_OPTIONS)
+        self.session_factory = sessionmaker(
+            bind=self.engine, class_=ReplicaSession, expire_on_commit=False, replica=self
+        )
+        self.healthy = False  # becomes True after the first successful probe
+        self.lag: Optional[float] = None
+        # Connection failures seen by any query take the replica out of rotation
+        # immediately instead of waiting for the next probe.
+        event.listen(self.engine.sync_engine, "handle_error", self._on_error)
+
+    @property
+    def name(self) -> str:
+        return self.engine.url.render_as_string(hide_password=True)
+
+    def _on_error(self, ctx):
+        if ctx.is_disconnect or ctx.connection is None:
+            self.mark_failed(ctx.original_exception)
+
+    def mark_failed(self, error):
+        if self.healthy:
+            logger.warning(f"⚠️ Replica {self.name} failed, falling back: {error}")
+        self.healthy = False
+
+    async def probe(self, primary_lsn: Optional[str] = None):
+        try:
+            async with self.engine.connect() as conn:
+                lag = await conn.scalar(REPLICA_LAG_SQL, {"primary_lsn": primary_lsn})
+            self.lag = None if lag is None else float(lag)
+            healthy = self.lag is not None and self.lag <= settings.REPLICA_MAX_LAG_SECONDS
+            if not healthy:
+                shown = "unknown" if self.lag is None else f"{self.lag:.1f}s"
+                logger.warning(f"⚠️ Replica {self.name} lag {shown}, skipping it.")
+        except Exception as e:
+            self.lag = None
+            healthy = False
+            if self.healthy:
+                logger.warning(f"⚠️ Replica {self.name} health check failed: {e}")
+        if healthy and not self.healthy:
+            logger.info(f"✅ Replica {self.name} is serving reads.")
+        self.healthy = healthy
+
+
+class ReplicaRouter:
+    """
+    Routes read-only sessions to healthy replicas (round-robin) and keeps
+    clients that just wrote pinned to the primary so they read their writes.
+    """
+
+    MAX_PINNED_CLIENTS = 10_000
+
+    def __init__(self, urls: list[str]):
+        self.replicas = [Replica(url) for url in urls]
+        self._next = itertools.count()
+        self._pinned: dict[str, float] = {}
+        self._monitor: Optional[asyncio.Task] = None
+
+    def pin_to_primary(self, client_key: str):
+        if not self.replicas:
+            return
+        now = time.monotonic()
+        if len(self._pinned) >= self.MAX_PINNED_CLIENTS:
+            self._pinned = {k: until for k, until in self._pinned.items() if until > now}
+        self._pinned[client_key] = now + settings.READ_YOUR_WRITES_SECONDS
+
+    def is_pinned(self, client_key: Optional[str]) -> bool:
+        if client_key is None:
+            return False
+        until = self._pinned.get(client_key)
+        if until is None:
+            return False
+        if until <= time.monotonic():
+            self._pinned.pop(client_key, None)
+            return False
+        return True
+
+    def pick(self, client_key: Optional[str] = None) -> Optional[Replica]:
+        """
+        Return the replica to read from, or None to use the primary.
+        """
+        if not self.replicas or self.is_pinned(client_key):
+            return None
+        n = len(self.replicas)
+        start = next(self._next)
+        for i in range(n):
+            replica = self.replicas[(start + i) % n]
+            if replica.healthy:
+                return replica
+        return None
+
+    async def check_all(self):
+        try:
+            async with engine.connect() as conn:
+                primary_lsn = await conn.scalar(PRIMARY_LSN_SQL)
+        except Exception as e:
+            logger.warning(f"⚠️ Could not read primary WAL position: {e}")
+            primary_lsn = None
+        await asyncio.gather(*(r.probe(primary_lsn) for r in self.replicas))
+
+    async def _monitor_loop(self):
+        while True:
+            await asyncio.sleep(settings.REPLICA_HEALTH_INTERVAL_SECONDS)
+            await self.check_all()
+
+    async def start(self):
+        if not self.replicas:
+            return
+        await self.check_all()
+        self._monitor = asyncio.create_task(self._monitor_loop())
+        healthy = sum(r.healthy for r in self.replicas)
+        logger.info(f"✅ Read replicas configured: {healthy}/{len(self.replicas)} healthy.")
+
+    async def close(self):
+        if self._monitor:
+            self._monitor.cancel()
+            self._monitor = None
+        for replica in self.replicas:
+            await replica.engine.dispose()
+
+
+replica_router = ReplicaRouter(settings.REPLICA_URLS)
+
+
+# Read-your-writes across server processes: a write sets this cookie to the
+# (unix) time until which the client's reads should stay on the primary.
+READ_YOUR_WRITES_COOKIE = "pg_primary_until"
+
+
+def pinned_by_cookie(request: Request) -> bool:
+    try:
+        until = float(request.cookies.get(READ_YOUR_WRITES_COOKIE, ""))
+    except ValueError:
+        return False
+    now = time.time()
+    # The value is client-controlled: ignore anything beyond one window
+    return now < until <= now + settings.READ_YOUR_WRITES_SECONDS
+
+
+def client_key(request: Request) -> Optional[str]:
+    """
+    Identify a client for read-your-writes pinning.
+    """
+    key = request.headers.get("x-client-id")
+    if key:
+        return key
+    return request.client.host if request.client else None
+
 
 async def init_postgres():
     """
@@ -29,16 +289,60 @@ async def init_postgres():
         async with engine.begin() as conn:
             # create tables based on Base metadata (models import will register tables)
             await conn.run_sync(Base.metadata.create_all)
+            for ddl in SCHEMA_UPGRADES:
+                await conn.execute(text(ddl))
         logger.info("✅ PostgreSQL tables created (if not existed).")
     except Exception as e:
         logger.error(f"❌ init_postgres failed: {e}")
         raise
+    await replica_router.start()
+
+
+async def close_postgres():
+    """
+    Stop replica health checks and dispose all engines.
+    """
+    await replica_router.close()
+    await engine.dispose()
+
+
+@asynccontextmanager
+async def read_session(request: Optional[Request] = None):
+    """
+    Session for read-only work: a healthy replica when one is available,
+    otherwise (or right after this client wrote) the primary.
+    """
+    replica = None
+    if request is None or not pinned_by_cookie(request):
+        replica = replica_router.pick(client_key(request) if request else None)
+    factory = replica.session_factory if replica else AsyncSessionLocal
+    async with factory() as session:
+        yield session
 
 
 # Dependency for routes
-async def get_postgres_session():
+async def get_postgres_session(request: Request, response: Response):
     """
-    Async dependency that yields a SQLAlchemy session.
+    Async dependency that yields a SQLAlchemy session on the primary.
+    Writes pin the client to the primary for READ_YOUR_WRITES_SECONDS, both
+    in this process (by client key) and, via a cookie, in every other one.
     """
+    if request.method not in SAFE_METHODS and replica_router.replicas:
+        key = client_key(request)
+        if key:
+            replica_router.pin_to_primary(key)
+        window = settings.READ_YOUR_WRITES_SECONDS
+        response.set_cookie(
+            READ_YOUR_WRITES_COOKIE, f"{time.time() + window:.3f}",
+            max_age=math.ceil(window), httponly=True, samesite="lax",
+        )
     async with AsyncSessionLocal() as session:
         yield session
+
+
+async def get_read_session(request: Request):
+    """
+    Async dependency for read-only handlers; see read_session().
+    """
+    async with read_session(request) as session:
+        yield session
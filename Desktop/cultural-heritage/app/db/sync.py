@@ -0,0 +1,74 @@
+# app/db/sync.py
+"""
+Helpers for the delta-sync change feed: tombstones for deleted records in
+both stores and the opaque sync token handed to clients.
+"""
+import base64
+import json
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Iterable, Optional
+
+from sqlalchemy import delete, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.tombstone_model import SyncTombstone
+
+logger = logging.getLogger("sync")
+
+MONGO_TOMBSTONES = "sync_tombstones"
+
+
+async def record_tombstones(session: AsyncSession, collection: str, ids: Iterable):
+    """
+    Add Postgres tombstones in the caller's transaction.
+    """
+    rows = [{"collection": collection, "record_id": str(i)} for i in ids]
+    if rows:
+        await session.execute(insert(SyncTombstone), rows)
+
+
+async def record_mongo_tombstone(db, collection: str, record_id: str):
+    await db[MONGO_TOMBSTONES].insert_one(
+        {"collection": collection, "record_id": record_id, "deleted_at": datetime.now(timezone.utc)}
+    )
+
+
+async def ensure_mongo_sync_indexes(db):
+    await db["oral_histories"].create_index("updated_at")
+    # TTL index: Mongo prunes tombstones past the retention window itself
+    await db[MONGO_TOMBSTONES].create_index(
+        "deleted_at", expireAfterSeconds=settings.SYNC_TOMBSTONE_RETENTION_DAYS * 86400
+    )
+
+
+async def prune_tombstones(session: AsyncSession):
+    """
+    Drop Postgres tombstones older than the retention window; clients with
+    older tokens are sent a full resync instead.
+    """
+    cutoff = datetime.now(timezone.utc) - timedelta(days=settings.SYNC_TOMBSTONE_RETENTION_DAYS)
+    result = await session.execute(delete(SyncTombstone).where(SyncTombstone.deleted_at < cutoff))
+    await session.commit()
+    if result.rowcount:
+        logger.info(f"🧹 Pruned {result.rowcount} sync tombstones.")
+
+
+def encode_sync_token(pg_watermark: datetime, mongo_watermark: datetime) -> str:
+    raw = json.dumps({"pg": pg_watermark.isoformat(), "mg": mongo_watermark.isoformat()})
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_sync_token(token: str) -> Optional[tuple[datetime, datetime]]:
+    """
+    Return (postgres watermark, mongo watermark), or None for a bad token.
+    """
+    try:
+        raw = json.loads(base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)))
+        pg, mongo = datetime.fromisoformat(raw["pg"]), datetime.fromisoformat(raw["mg"])
+    except (ValueError, KeyError, TypeError):
+        return None
+    if pg.tzinfo is None or mongo.tzinfo is None:
+        return None
+    return pg, mongo
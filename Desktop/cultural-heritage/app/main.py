@@ -1,4 +1,5 @@
 # app/main.py
+import asyncio
 import logging
 from pathlib import Path
 from fastapi import FastAPI, Request, UploadFile, File, HTTPException
@@ -8,11 +9,16 @@ from fastapi.staticfiles import StaticFiles
 from datetime import datetime
 import secrets
 
+from app.core.admission import AdmissionControlMiddleware
 from app.core.config import settings
-from app.core.logging_config import setup_logging
-from app.db.postgres import init_postgres, engine as POSTGRES_ENGINE
+from app.core.jobs import job_manager
+from app.core.logging_config import RequestIdMiddleware, get_logging_stats, setup_logging
+from app.core.security import TokenAuthMiddleware, token_verifier
+from app.db.postgres import init_postgres, close_postgres, read_session, AsyncSessionLocal
 from app.db.mongo import init_mongo, close_mongo_client, get_mongo_db
-from app.routes import sites, oral_histories, artefacts, auth  # ADDED auth
+from app.db.sync import ensure_mongo_sync_indexes, prune_tombstones
+from app.routes import sites, oral_histories, artefacts, auth, sync, jobs, telemetry  # ADDED auth
+from app.telemetry import telemetry_store
 
 # Setup logging
 setup_logging()
@@ -23,6 +29,10 @@ app = FastAPI(
     debug=settings.DEBUG,
 )
 
+# Per-route-class concurrency limits and per-client rate limits. Added before
+# CORS so that 429/503 responses still carry CORS headers.
+app.add_middleware(AdmissionControlMiddleware)
+
 # CORS setup
 app.add_middleware(
     CORSMiddleware,
@@ -31,6 +41,12 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Bearer token verification (no DB round trip); sets request.state.user
+app.add_middleware(TokenAuthMiddleware)
+
+# Outermost: request-id correlation for every log line and response
+app.add_middleware(RequestIdMiddleware)
+
 # ✅ NEW: Static file serving for uploads
 BASE_DIR = Path(__file__).resolve().parent.parent
 UPLOADS_DIR = BASE_DIR / "uploads"
@@ -42,6 +58,9 @@ app.include_router(sites.router, prefix="/sites", tags=["Sites"])
 app.include_router(oral_histories.router, prefix="/oral-histories", tags=["Oral Histories"])
 app.include_router(artefacts.router, prefix="/artefacts", tags=["Artefacts"])
 app.include_router(auth.router, prefix="/auth", tags=["Authentication"])  # ADDED THIS LINE
+app.include_router(sync.router, prefix="/sync", tags=["Sync"])
+app.include_router(jobs.router, prefix="/jobs", tags=["Jobs"])
+app.include_router(telemetry.router, prefix="/telemetry", tags=["Telemetry"])
 
 # ✅ FRONTEND PATH FIX
 FRONTEND_DIR = BASE_DIR / "frontend"
@@ -51,15 +70,33 @@ async def on_startup():
     logger.info("Starting Cultural Heritage app...")
     await init_postgres()
     logger.info("PostgreSQL initialized.")
+    await token_verifier.start()
+    await job_manager.start()
     await init_mongo()
     logger.info("MongoDB initialized.")
+    try:
+        await ensure_mongo_sync_indexes(get_mongo_db())
+        async with AsyncSessionLocal() as session:
+            await prune_tombstones(session)
+    except Exception as e:
+        logger.warning(f"Sync maintenance warning: {e}")
+    await asyncio.to_thread(telemetry_store.open)
 
 @app.on_event("shutdown")
 async def on_shutdown():
     logger.info("Shutting down Cultural Heritage app...")
+    await token_verifier.stop()
+    try:
+        await job_manager.stop()
+    except Exception as e:
+        logger.warning(f"Job manager stop warning: {e}")
+    try:
+        await asyncio.to_thread(telemetry_store.close)
+    except Exception as e:
+        logger.warning(f"Telemetry store close warning: {e}")
     try:
-        await POSTGRES_ENGINE.dispose()
-        logger.info("Postgres engine disposed.")
+        await close_postgres()
+        logger.info("Postgres engines disposed.")
     except Exception as e:
         logger.warning(f"Postgres dispose warning: {e}")
     try:
@@ -87,13 +124,13 @@ async def upload_file(file: UploadFile = File(...)):
         # Generate unique filename
         file_extension = file.filename.split('.')[-1] if '.' in file.filename else ''
         unique_filename = f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{secrets.token_hex(8)}.{file_extension}"
+
         file_path = UPLOADS_DIR / unique_filename
-        
-        # Save file
-        with open(file_path, "wb") as f:
-            content = await file.read()
-            f.write(content)
-        
+
+        # Save file (the write runs in a thread so it doesn't block the event loop)
+        content = await file.read()
+        await asyncio.to_thread(file_path.write_bytes, content)
+
         return {
             "message": "File uploaded successfully",
             "filename": unique_filename,
@@ -106,17 +143,16 @@ async def upload_file(file: UploadFile = File(...)):
 
 # ✅ STATS ENDPOINT
 @app.get("/stats")
-async def get_stats():
+async def get_stats(request: Request):
     """Get statistics for both databases"""
     try:
-        from app.db.postgres import AsyncSessionLocal
         from app.models.site_model import Site
         from app.models.artefact_model import Artefact
         from app.db.mongo import get_mongo_db
         from sqlalchemy import select, func
         
         # PostgreSQL count - Sites
-        async with AsyncSessionLocal() as session:
+        async with read_session(request) as session:
             result = await session.execute(select(func.count(Site.site_id)))
             sites_count = result.scalar() or 0
             
@@ -153,14 +189,13 @@ async def get_stats():
 
 # ✅ CHART DATA ENDPOINT
 @app.get("/chart-data")
-async def get_chart_data():
+async def get_chart_data(request: Request):
     """Get data for charts"""
     try:
-        from app.db.postgres import AsyncSessionLocal
         from app.models.site_model import Site
         from sqlalchemy import select, func
         
-        async with AsyncSessionLocal() as session:
+        async with read_session(request) as session:
             # Sites by country
             result = await session.execute(
                 select(Site.location_country, func.count(Site.site_id))
@@ -186,16 +221,15 @@ async def get_chart_data():
 
 # ✅ CULTURAL INSIGHTS ENDPOINT - NEW
 @app.get("/cultural-insights")
-async def get_cultural_insights():
+async def get_cultural_insights(request: Request):
     """Get auto-generated cultural insights from both databases"""
     try:
-        from app.db.postgres import AsyncSessionLocal
         from app.models.site_model import Site
         from app.models.artefact_model import Artefact
         from app.db.mongo import get_mongo_db
         from sqlalchemy import select, func, desc
         
-        async with AsyncSessionLocal() as session:
+        async with read_session(request) as session:
             # 1. Site with most artefacts
             result = await session.execute(
                 select(Site.site_name, func.count(Artefact.artefact_id))
@@ -269,13 +303,12 @@ async def get_cultural_insights():
 
 # ✅ MAP DATA ENDPOINT - NEW
 @app.get("/map-data")
-async def get_map_data():
+async def get_map_data(request: Request):
     """Get site data for the interactive map"""
     try:
-        from app.db.postgres import AsyncSessionLocal
         from app.models.site_model import Site
         
-        async with AsyncSessionLocal() as session:
+        async with read_session(request) as session:
             result = await session.execute(
                 select(
                     Site.site_id,
@@ -312,7 +345,8 @@ async def get_map_data():
 @app.get("/health")
 async def health():
     mongo_db = get_mongo_db()
-    return {"status": "ok", "postgres": True, "mongo": mongo_db is not None}
+    return {"status": "ok", "postgres": True, "mongo": mongo_db is not None,
+            "logging": get_logging_stats(), "telemetry": telemetry_store.stats()}
 
 @app.get("/")
 async def root():
@@ -328,6 +362,9 @@ async def root():
             "map_data": "/map-data",
             "artefacts": "/artefacts",
             "upload": "/upload",
-            "auth": "/auth"  # ADDED THIS LINE
+            "auth": "/auth",  # ADDED THIS LINE
+            "sync": "/sync",
+            "jobs": "/jobs",
+            "telemetry": "/telemetry"
         }
     }
\ No newline at end of file
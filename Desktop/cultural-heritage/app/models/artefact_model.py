@@ -1,5 +1,6 @@
 # app/models/artefact_model.py
-from sqlalchemy import Column, Integer, String, Text
+from sqlalchemy import Column, Integer, String, Text, DateTime
+from sqlalchemy.sql import func
 from app.db.base import Base
 
 class Artefact(Base):
@@ -7,12 +8,15 @@ class Artefact(Base):
 
     artefact_id = Column(Integer, primary_key=True, autoincrement=True)
     name = Column(String(255), nullable=False)
-    site_name = Column(String(255))
+    site_name = Column(String(255), index=True)  # join key to Site.name
     category = Column(String(100))
     material = Column(String(100))
     description = Column(Text)
     image_url = Column(Text)
     discovered_year = Column(Integer)
+    # TIMESTAMPS (used by conditional GETs and delta sync)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), index=True)
 
     def to_dict(self):
         return {
@@ -23,5 +27,7 @@ class Artefact(Base):
             "material": self.material,
             "description": self.description,
             "image_url": self.image_url,
-            "discovered_year": self.discovered_year
+            "discovered_year": self.discovered_year,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+            "updated_at": self.updated_at.isoformat() if self.updated_at else None,
         }
\ No newline at end of file
@@ -0,0 +1,10 @@
+# app/models/bulk_model.py
+from pydantic import BaseModel, Field
+from typing import Any, Dict, List, Optional
+
+class BulkSelector(BaseModel):
+    ids: Optional[List[int]] = Field(None, max_length=1000)
+    filter: Optional[Dict[str, Any]] = None  # field -> value (or list of values)
+
+class BulkUpdateIn(BulkSelector):
+    updates: Dict[str, Any]
@@ -0,0 +1,37 @@
+# app/models/job_model.py
+from sqlalchemy import Column, Integer, String, Float, Text, DateTime, JSON
+from sqlalchemy.sql import func
+from app.db.base import Base
+
+class Job(Base):
+    """Durable record of a background job (see app/core/jobs.py)."""
+    __tablename__ = "background_jobs"
+
+    job_id = Column(String(32), primary_key=True)
+    kind = Column(String(50), nullable=False)
+    status = Column(String(20), nullable=False, default="queued", index=True)
+    priority = Column(Integer, nullable=False, default=5)  # lower runs first
+    payload = Column(JSON)
+    progress = Column(Float, default=0.0)
+    message = Column(Text)
+    result = Column(JSON)
+    error = Column(Text)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    started_at = Column(DateTime(timezone=True))
+    owner = Column(String(32))  # boot id of the process running the job
+    heartbeat_at = Column(DateTime(timezone=True))  # last progress flush while running
+    finished_at = Column(DateTime(timezone=True))
+
+    def to_dict(self):
+        return {
+            "job_id": self.job_id,
+            "kind": self.kind,
+            "status": self.status,
+            "priority": self.priority,
+            "progress": self.progress,
+            "message": self.message,
+            "error": self.error,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+        }
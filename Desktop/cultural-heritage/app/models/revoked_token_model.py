@@ -0,0 +1,13 @@
+# app/models/revoked_token_model.py
+from sqlalchemy import Column, Integer, String, DateTime
+from sqlalchemy.sql import func
+from app.db.base import Base
+
+class RevokedToken(Base):
+    """A logged-out session token, shared so every worker rejects it (see app/core/security.py)."""
+    __tablename__ = "revoked_tokens"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    jti = Column(String(32), nullable=False, unique=True)
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True)
+    revoked_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
@@ -1,5 +1,5 @@
 # app/models/site_model.py
-from sqlalchemy import Column, Integer, String, Float, Text, DateTime
+from sqlalchemy import Column, Integer, String, Float, Text, DateTime, Index
 from sqlalchemy.sql import func
 from app.db.base import Base
 
@@ -17,6 +17,11 @@ class Site(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
+    # last change time (updated_at is only set on update); drives delta sync
+    __table_args__ = (
+        Index("ix_heritage_sites_changed_at", func.coalesce(updated_at, created_at)),
+    )
+
     def to_dict(self):
         return {
             "id": self.site_id,
@@ -0,0 +1,12 @@
+# app/models/telemetry_model.py
+from datetime import datetime
+from pydantic import BaseModel, Field
+from typing import Dict, List, Optional
+
+class TelemetryReading(BaseModel):
+    node: str
+    ts: Optional[datetime] = None  # defaults to the time the batch is received
+    values: Dict[str, Optional[float]]  # metric -> reading, e.g. {"soil": 41.5, "temp": 24.1}
+
+class TelemetryBatch(BaseModel):
+    readings: List[TelemetryReading] = Field(..., min_length=1, max_length=10_000)
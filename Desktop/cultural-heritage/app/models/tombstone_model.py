@@ -0,0 +1,13 @@
+# app/models/tombstone_model.py
+from sqlalchemy import Column, Integer, String, DateTime
+from sqlalchemy.sql import func
+from app.db.base import Base
+
+class SyncTombstone(Base):
+    """Marks a deleted row so delta-sync clients can drop it from their cache."""
+    __tablename__ = "sync_tombstones"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    collection = Column(String(50), nullable=False)
+    record_id = Column(String(64), nullable=False)
+    deleted_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
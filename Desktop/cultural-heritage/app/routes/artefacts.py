@@ -1,19 +1,35 @@
 # app/routes/artefacts.py
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from sqlalchemy import func
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 
-from app.db.postgres import get_postgres_session
+from app.core.conditional import Validators, collection_versions
+from app.db.bulk import BulkError, build_where, bulk_delete, bulk_update, clean_updates
+from app.db.postgres import get_postgres_session, get_read_session
+from app.db.sync import record_tombstones
 from app.models.artefact_model import Artefact
+from app.models.bulk_model import BulkSelector, BulkUpdateIn
 
 router = APIRouter()
 
+# Columns that PUT/PATCH may write and bulk selectors may filter on
+UPDATABLE_FIELDS = ("name", "site_name", "category", "material", "description", "image_url", "discovered_year")
+FILTERABLE_FIELDS = ("site_name", "category", "material", "discovered_year")
+
 @router.get("/")
-async def get_artefacts(session: AsyncSession = Depends(get_postgres_session)):
+async def get_artefacts(request: Request, response: Response, session: AsyncSession = Depends(get_read_session)):
     """Get all artefacts"""
     try:
+        result = await session.execute(select(func.count(Artefact.artefact_id), func.max(Artefact.updated_at)))
+        count, last_modified = result.one()
+        validators = Validators("artefacts", count, last_modified)
+        if validators.matches(request):
+            return validators.not_modified()
+
         result = await session.execute(select(Artefact))
         artefacts = result.scalars().all()
+        validators.apply(response)
         return [artefact.to_dict() for artefact in artefacts]
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching artefacts: {str(e)}")
@@ -25,25 +41,91 @@ async def create_artefact(artefact_data: dict, session: AsyncSession = Depends(g
         new_artefact = Artefact(**artefact_data)
         session.add(new_artefact)
         await session.commit()
+        collection_versions.bump("artefacts")
         await session.refresh(new_artefact)
         return {"message": "Artefact created successfully", "data": new_artefact.to_dict()}
     except Exception as e:
         await session.rollback()
         raise HTTPException(status_code=500, detail=f"Error creating artefact: {str(e)}")
 
+@router.put("/{artefact_id}")
+async def update_artefact(artefact_id: int, artefact_data: dict, session: AsyncSession = Depends(get_postgres_session)):
+    """Update an artefact"""
+    try:
+        values = {field: value for field, value in artefact_data.items() if field in UPDATABLE_FIELDS}
+        if values:
+            artefacts = await bulk_update(session, Artefact, values, [Artefact.artefact_id == artefact_id])
+        else:
+            result = await session.execute(select(Artefact).where(Artefact.artefact_id == artefact_id))
+            artefacts = result.scalars().all()
+        if not artefacts:
+            raise HTTPException(status_code=404, detail="Artefact not found")
+
+        await session.commit()
+        collection_versions.bump("artefacts")
+        return {"message": "Artefact updated successfully", "data": artefacts[0].to_dict()}
+    except HTTPException:
+        await session.rollback()
+        raise
+    except Exception as e:
+        await session.rollback()
+        raise HTTPException(status_code=500, detail=f"Error updating artefact: {str(e)}")
+
 @router.delete("/{artefact_id}")
 async def delete_artefact(artefact_id: int, session: AsyncSession = Depends(get_postgres_session)):
     """Delete an artefact"""
     try:
-        result = await session.execute(select(Artefact).where(Artefact.artefact_id == artefact_id))
-        artefact = result.scalar_one_or_none()
-        
-        if not artefact:
+        deleted = await bulk_delete(session, Artefact, Artefact.artefact_id, [Artefact.artefact_id == artefact_id])
+        if not deleted:
             raise HTTPException(status_code=404, detail="Artefact not found")
-        
-        await session.delete(artefact)
+        await record_tombstones(session, "artefacts", deleted)
+
         await session.commit()
+        collection_versions.bump("artefacts")
         return {"message": "Artefact deleted successfully"}
+    except HTTPException:
+        await session.rollback()
+        raise
+    except Exception as e:
+        await session.rollback()
+        raise HTTPException(status_code=500, detail=f"Error deleting artefact: {str(e)}")
+
+@router.patch("/")
+async def bulk_update_artefacts(payload: BulkUpdateIn, session: AsyncSession = Depends(get_postgres_session)):
+    """Update many artefacts in one statement"""
+    try:
+        values = clean_updates(payload.updates, UPDATABLE_FIELDS)
+        clauses = build_where(Artefact, Artefact.artefact_id, payload.ids, payload.filter, FILTERABLE_FIELDS)
+        if not values:
+            raise BulkError("No fields to update")
+        artefacts = await bulk_update(session, Artefact, values, clauses)
+        await session.commit()
+        if artefacts:
+            collection_versions.bump("artefacts")
+        return {
+            "message": f"{len(artefacts)} artefact(s) updated",
+            "count": len(artefacts),
+            "data": [artefact.to_dict() for artefact in artefacts],
+        }
+    except BulkError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        await session.rollback()
+        raise HTTPException(status_code=500, detail=f"Error updating artefacts: {str(e)}")
+
+@router.delete("/")
+async def bulk_delete_artefacts(payload: BulkSelector, session: AsyncSession = Depends(get_postgres_session)):
+    """Delete many artefacts in one statement"""
+    try:
+        clauses = build_where(Artefact, Artefact.artefact_id, payload.ids, payload.filter, FILTERABLE_FIELDS)
+        deleted = await bulk_delete(session, Artefact, Artefact.artefact_id, clauses)
+        await record_tombstones(session, "artefacts", deleted)
+        await session.commit()
+        if deleted:
+            collection_versions.bump("artefacts")
+        return {"message": f"{len(deleted)} artefact(s) deleted", "count": len(deleted), "deleted_ids": deleted}
+    except BulkError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         await session.rollback()
-        raise HTTPException(status_code=500, detail=f"Error deleting artefact: {str(e)}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Error deleting artefacts: {str(e)}")
\ No newline at end of file
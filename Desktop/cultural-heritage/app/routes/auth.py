@@ -3,8 +3,15 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from app.db.postgres import get_postgres_session
 from app.models.user_model import User
+from app.core.security import (
+    create_session_token,
+    get_current_user,
+    hash_password,
+    needs_rehash,
+    token_verifier,
+    verify_password,
+)
 from pydantic import BaseModel
-import hashlib
 
 router = APIRouter()
 
@@ -12,9 +19,6 @@ class LoginInput(BaseModel):
     username: str
     password: str
 
-def hash_password(password: str):
-    return hashlib.sha256(password.encode()).hexdigest()
-
 @router.post("/register")
 async def register_user(data: LoginInput, session: AsyncSession = Depends(get_postgres_session)):
     # Check if user already exists
@@ -23,7 +27,7 @@ async def register_user(data: LoginInput, session: AsyncSession = Depends(get_po
     if existing_user:
         raise HTTPException(status_code=400, detail="Username already exists")
     
-    hashed_pw = hash_password(data.password)
+    hashed_pw = await hash_password(data.password)
     user = User(username=data.username, password=hashed_pw)
     session.add(user)
     await session.commit()
@@ -32,9 +36,33 @@ async def register_user(data: LoginInput, session: AsyncSession = Depends(get_po
 
 @router.post("/login")
 async def login(data: LoginInput, session: AsyncSession = Depends(get_postgres_session)):
-    hashed_pw = hash_password(data.password)
     result = await session.execute(select(User).where(User.username == data.username))
     user = result.scalars().first()
-    if not user or user.password != hashed_pw:
+    if not await verify_password(data.password, user.password if user else None):
         raise HTTPException(status_code=401, detail="Invalid username or password")
-    return {"username": user.username, "is_admin": user.is_admin}
\ No newline at end of file
+
+    # Upgrade legacy SHA-256 hashes now that we know the plaintext
+    if needs_rehash(user.password):
+        user.password = await hash_password(data.password)
+        await session.commit()
+
+    token, expires_at = create_session_token(user.id, user.username, user.is_admin)
+    return {
+        "username": user.username,
+        "is_admin": user.is_admin,
+        "access_token": token,
+        "token_type": "bearer",
+        "expires_at": expires_at,
+    }
+
+@router.post("/logout")
+async def logout(user: dict = Depends(get_current_user)):
+    try:
+        await token_verifier.revoke(user)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error recording logout: {e}")
+    return {"message": "Logged out"}
+
+@router.get("/me")
+async def me(user: dict = Depends(get_current_user)):
+    return {"id": user["uid"], "username": user["sub"], "is_admin": user["adm"]}
\ No newline at end of file
@@ -0,0 +1,51 @@
+# app/routes/jobs.py
+from fastapi import APIRouter, HTTPException, status
+from fastapi.responses import JSONResponse
+from sqlalchemy import desc
+from sqlalchemy.future import select
+
+from app.core.jobs import FINISHED_STATUSES, job_manager
+from app.db.postgres import AsyncSessionLocal
+from app.models.job_model import Job
+
+router = APIRouter()
+
+
+@router.get("/", summary="List recent background jobs")
+async def list_jobs(limit: int = 50):
+    try:
+        async with AsyncSessionLocal() as session:
+            result = await session.execute(select(Job).order_by(desc(Job.created_at)).limit(min(limit, 200)))
+            return [job.to_dict() for job in result.scalars().all()]
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error listing jobs: {e}")
+
+
+@router.get("/{job_id}", summary="Job status and progress")
+async def get_job(job_id: str):
+    job = await job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job.to_dict()
+
+
+@router.get("/{job_id}/result", summary="Job result")
+async def get_job_result(job_id: str):
+    job = await job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if job.status not in FINISHED_STATUSES:
+        return JSONResponse(status_code=status.HTTP_202_ACCEPTED, content=job.to_dict())
+    if job.status != "succeeded":
+        raise HTTPException(status_code=409, detail=f"Job {job.status}: {job.error or 'no result'}")
+    return job.result
+
+
+@router.delete("/{job_id}", summary="Cancel a job")
+async def cancel_job(job_id: str):
+    if await job_manager.cancel(job_id):
+        return {"message": "Cancellation requested", "job_id": job_id}
+    job = await job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    raise HTTPException(status_code=409, detail=f"Job already {job.status}")
@@ -1,22 +1,33 @@
 # app/routes/oral_histories.py
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from bson import ObjectId
+from datetime import datetime, timezone
 
+from app.core.conditional import Validators, collection_versions
 from app.db.mongo import get_mongo_db
+from app.db.sync import record_mongo_tombstone
 from app.models.oral_model import OralHistoryIn
 
 router = APIRouter()
 
 
 @router.get("/", summary="Get oral histories")
-async def get_oral_histories(db=Depends(get_mongo_db)):
+async def get_oral_histories(request: Request, response: Response, db=Depends(get_mongo_db)):
     try:
         collection = db["oral_histories"]
+        count = await collection.count_documents({})
+        newest = await collection.find_one({}, projection={"_id": 1}, sort=[("_id", -1)])
+        newest_id = newest["_id"] if newest else None
+        validators = Validators("oral_histories", count, newest_id)
+        if validators.matches(request):
+            return validators.not_modified()
+
         cursor = collection.find({})
         items = await cursor.to_list(length=200)
         # convert ObjectId to string for front-end
         for item in items:
             item["_id"] = str(item["_id"])
+        validators.apply(response)
         return {"count": len(items), "data": items}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -27,7 +38,9 @@ async def add_oral_history(payload: OralHistoryIn, db=Depends(get_mongo_db)):
     try:
         collection = db["oral_histories"]
         doc = payload.dict()
+        doc["created_at"] = doc["updated_at"] = datetime.now(timezone.utc)
         res = await collection.insert_one(doc)
+        collection_versions.bump("oral_histories")
         return {"message": "Oral history added", "id": str(res.inserted_id)}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -40,6 +53,8 @@ async def delete_oral_history(oid: str, db=Depends(get_mongo_db)):
         result = await collection.delete_one({"_id": ObjectId(oid)})
         if result.deleted_count == 0:
             raise HTTPException(status_code=404, detail="Record not found")
+        await record_mongo_tombstone(db, "oral_histories", oid)
+        collection_versions.bump("oral_histories")
         return {"message": "Deleted"}
     except HTTPException:
         raise
@@ -1,35 +1,141 @@
 # app/routes/sites.py
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from sqlalchemy import func
 from sqlalchemy.future import select
 from sqlalchemy.ext.asyncio import AsyncSession
+import asyncio
 import csv
 import json
+import logging
 from datetime import datetime
 
-from app.db.postgres import get_postgres_session
+from app.core.conditional import Validators, collection_versions
+from app.core.dataloader import DataLoader
+from app.core.jobs import JobContext, JobQueueFull, job_manager
+from app.db.bulk import BulkError, build_where, bulk_delete, bulk_update, clean_updates
+from app.db.mongo import get_mongo_db
+from app.db.postgres import get_postgres_session, get_read_session, read_session
+from app.db.sync import record_tombstones
+from app.models.artefact_model import Artefact
+from app.models.bulk_model import BulkSelector, BulkUpdateIn
 from app.models.site_model import Site
 
+logger = logging.getLogger("sites")
+
 router = APIRouter()
 
+# Columns that PUT/PATCH may write and bulk selectors may filter on
+UPDATABLE_FIELDS = ("name", "description", "location_city", "location_country", "latitude", "longitude")
+FILTERABLE_FIELDS = ("name", "location_city", "location_country")
+MAX_FULL_SITES = 100
+
+
+async def load_full_sites(site_ids: list[int], session: AsyncSession, db) -> list[dict]:
+    """
+    Load sites with their artefacts (joined on Artefact.site_name) and oral
+    histories (joined on region = site city or country). Uses three queries
+    however many sites are requested; the Postgres and Mongo lookups run
+    concurrently.
+    """
+    result = await session.execute(select(Site).where(Site.site_id.in_(site_ids)))
+    by_id = {site.site_id: site for site in result.scalars().all()}
+    sites = [by_id[i] for i in dict.fromkeys(site_ids) if i in by_id]
+
+    async def batch_artefacts(names):
+        result = await session.execute(select(Artefact).where(Artefact.site_name.in_(names)))
+        grouped = {}
+        for artefact in result.scalars().all():
+            grouped.setdefault(artefact.site_name, []).append(artefact.to_dict())
+        return grouped
+
+    async def batch_oral_histories(regions):
+        if db is None:
+            return {}
+        grouped = {}
+        async for doc in db["oral_histories"].find({"region": {"$in": regions}}):
+            doc["_id"] = str(doc["_id"])
+            grouped.setdefault(doc["region"], []).append(doc)
+        return grouped
+
+    artefact_loader = DataLoader(batch_artefacts)
+    oral_history_loader = DataLoader(batch_oral_histories)
+
+    async def assemble(site):
+        # City and country can be the same region (e.g. Singapore); load it once
+        regions = list(dict.fromkeys(r for r in (site.location_city, site.location_country) if r))
+        artefacts, histories = await asyncio.gather(
+            artefact_loader.load(site.name),
+            oral_history_loader.load_many(regions),
+        )
+        data = site.to_dict()
+        data["artefacts"] = artefacts
+        data["oral_histories"] = [h for group in histories for h in group]
+        return data
+
+    return list(await asyncio.gather(*(assemble(site) for site in sites)))
+
 # ✅ Fetch all sites
 @router.get("/", summary="Get all cultural sites")
-async def get_sites(session: AsyncSession = Depends(get_postgres_session)):
+async def get_sites(request: Request, response: Response, session: AsyncSession = Depends(get_read_session)):
     try:
+        # Cheap validators first; only load the table when the client's copy is stale
+        result = await session.execute(
+            select(func.count(Site.site_id), func.max(func.coalesce(Site.updated_at, Site.created_at)))
+        )
+        count, last_modified = result.one()
+        validators = Validators("sites", count, last_modified)
+        if validators.matches(request):
+            return validators.not_modified()
+
         result = await session.execute(select(Site))
         sites = result.scalars().all()
+        validators.apply(response)
         return [s.to_dict() for s in sites]
     except Exception as e:
-        print(f"❌ Database error: {e}")
+        logger.error(f"❌ Database error: {e}")
         return []
 
+# ✅ Get many sites with artefacts and oral histories
+@router.get("/full", summary="Get several sites with related records")
+async def get_sites_full(
+    ids: list[int] = Query(..., description="Site ids, e.g. ?ids=1&ids=2"),
+    session: AsyncSession = Depends(get_read_session),
+    db=Depends(get_mongo_db),
+):
+    if len(ids) > MAX_FULL_SITES:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_FULL_SITES} ids per request")
+    try:
+        return await load_full_sites(ids, session, db)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching sites: {e}")
+
+# ✅ Get single site with artefacts and oral histories
+@router.get("/{site_id}/full", summary="Get site with related records")
+async def get_site_full(site_id: int, session: AsyncSession = Depends(get_read_session), db=Depends(get_mongo_db)):
+    try:
+        sites = await load_full_sites([site_id], session, db)
+        if not sites:
+            raise HTTPException(status_code=404, detail="Site not found")
+        return sites[0]
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching site: {e}")
+
 # ✅ Get single site by ID  
 @router.get("/{site_id}", summary="Get site by ID")
-async def get_site(site_id: int, session: AsyncSession = Depends(get_postgres_session)):
+async def get_site(site_id: int, request: Request, response: Response, session: AsyncSession = Depends(get_read_session)):
     try:
         result = await session.execute(select(Site).where(Site.site_id == site_id))
         site = result.scalars().first()
         if not site:
             raise HTTPException(status_code=404, detail="Site not found")
+
+        last_modified = site.updated_at or site.created_at
+        validators = Validators("sites", site_id, last_modified, last_modified=last_modified)
+        if validators.matches(request):
+            return validators.not_modified()
+        validators.apply(response)
         return site.to_dict()
     except HTTPException:
         raise
@@ -50,6 +156,7 @@ async def add_site(data: dict, session: AsyncSession = Depends(get_postgres_sess
         )
         session.add(new_site)
         await session.commit()
+        collection_versions.bump("sites")
         await session.refresh(new_site)
         return {"message": "Site added successfully", "data": new_site.to_dict()}
     except Exception as e:
@@ -60,18 +167,22 @@ async def add_site(data: dict, session: AsyncSession = Depends(get_postgres_sess
 @router.put("/{site_id}", summary="Update site details")
 async def update_site(site_id: int, data: dict, session: AsyncSession = Depends(get_postgres_session)):
     try:
-        result = await session.execute(select(Site).where(Site.site_id == site_id))
-        site = result.scalars().first()
-        if not site:
+        # Unknown keys are ignored here, as before; PATCH / is strict
+        values = {field: value for field, value in data.items() if field in UPDATABLE_FIELDS}
+        if values:
+            sites = await bulk_update(session, Site, values, [Site.site_id == site_id])
+        else:
+            result = await session.execute(select(Site).where(Site.site_id == site_id))
+            sites = result.scalars().all()
+        if not sites:
             raise HTTPException(status_code=404, detail="Site not found")
 
-        for field, value in data.items():
-            if hasattr(site, field):
-                setattr(site, field, value)
-
         await session.commit()
-        await session.refresh(site)
-        return {"message": "Site updated successfully", "data": site.to_dict()}
+        collection_versions.bump("sites")
+        return {"message": "Site updated successfully", "data": sites[0].to_dict()}
+    except HTTPException:
+        await session.rollback()
+        raise
     except Exception as e:
         await session.rollback()
         raise HTTPException(status_code=500, detail=f"Error updating site: {e}")
@@ -80,23 +191,62 @@ async def update_site(site_id: int, data: dict, session: AsyncSession = Depends(
 @router.delete("/{site_id}", summary="Delete site by ID")
 async def delete_site(site_id: int, session: AsyncSession = Depends(get_postgres_session)):
     try:
-        result = await session.execute(select(Site).where(Site.site_id == site_id))
-        site = result.scalars().first()
-        if not site:
+        deleted = await bulk_delete(session, Site, Site.site_id, [Site.site_id == site_id])
+        if not deleted:
             raise HTTPException(status_code=404, detail="Site not found")
+        await record_tombstones(session, "sites", deleted)
 
-        await session.delete(site)
         await session.commit()
+        collection_versions.bump("sites")
         return {"message": f"Site {site_id} deleted successfully"}
+    except HTTPException:
+        await session.rollback()
+        raise
     except Exception as e:
         await session.rollback()
         raise HTTPException(status_code=500, detail=f"Error deleting site: {e}")
 
+# ✅ BULK UPDATE SITES
+@router.patch("/", summary="Update many sites in one statement")
+async def bulk_update_sites(payload: BulkUpdateIn, session: AsyncSession = Depends(get_postgres_session)):
+    try:
+        values = clean_updates(payload.updates, UPDATABLE_FIELDS)
+        clauses = build_where(Site, Site.site_id, payload.ids, payload.filter, FILTERABLE_FIELDS)
+        if not values:
+            raise BulkError("No fields to update")
+        sites = await bulk_update(session, Site, values, clauses)
+        await session.commit()
+        if sites:
+            collection_versions.bump("sites")
+        return {"message": f"{len(sites)} site(s) updated", "count": len(sites), "data": [s.to_dict() for s in sites]}
+    except BulkError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        await session.rollback()
+        raise HTTPException(status_code=500, detail=f"Error updating sites: {e}")
+
+# ✅ BULK DELETE SITES
+@router.delete("/", summary="Delete many sites in one statement")
+async def bulk_delete_sites(payload: BulkSelector, session: AsyncSession = Depends(get_postgres_session)):
+    try:
+        clauses = build_where(Site, Site.site_id, payload.ids, payload.filter, FILTERABLE_FIELDS)
+        deleted = await bulk_delete(session, Site, Site.site_id, clauses)
+        await record_tombstones(session, "sites", deleted)
+        await session.commit()
+        if deleted:
+            collection_versions.bump("sites")
+        return {"message": f"{len(deleted)} site(s) deleted", "count": len(deleted), "deleted_ids": deleted}
+    except BulkError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        await session.rollback()
+        raise HTTPException(status_code=500, detail=f"Error deleting sites: {e}")
+
 # ✅ SEARCH SITES
 @router.get("/search/", summary="Search sites by name")
 async def search_sites(
     query: str = "", 
-    session: AsyncSession = Depends(get_postgres_session)
+    session: AsyncSession = Depends(get_read_session)
 ):
     try:
         if not query:
@@ -110,34 +260,48 @@ async def search_sites(
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Search error: {e}")
 
-# ✅ EXPORT SITES TO CSV
-@router.get("/export/csv", summary="Export sites to CSV")
-async def export_sites_csv(session: AsyncSession = Depends(get_postgres_session)):
-    try:
+# ✅ EXPORT SITES TO CSV (background job)
+def _write_sites_csv(filename: str, sites_data: list[dict], ctx: JobContext):
+    with open(filename, 'w', newline='', encoding='utf-8') as csvfile:
+        writer = csv.DictWriter(csvfile, fieldnames=sites_data[0].keys())
+        writer.writeheader()
+        for i, row in enumerate(sites_data, 1):
+            writer.writerow(row)
+            if i % 500 == 0:
+                ctx.report(i / len(sites_data), f"{i}/{len(sites_data)} rows written")
+
+
+@job_manager.handler("export_sites_csv")
+async def export_sites_csv_job(ctx: JobContext, payload: dict):
+    async with read_session() as session:
         result = await session.execute(select(Site))
-        sites = result.scalars().all()
-        
-        if not sites:
-            raise HTTPException(status_code=404, detail="No sites to export")
-        
-        # Convert to dict list
-        sites_data = [s.to_dict() for s in sites]
-        
-        # Create CSV
-        filename = f"cultural_sites_export_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
-        with open(filename, 'w', newline='', encoding='utf-8') as csvfile:
-            if sites_data:
-                writer = csv.DictWriter(csvfile, fieldnames=sites_data[0].keys())
-                writer.writeheader()
-                writer.writerows(sites_data)
-        
-        return {
-            "message": "Sites exported successfully", 
-            "filename": filename,
-            "count": len(sites_data)
-        }
+        sites_data = [s.to_dict() for s in result.scalars().all()]
+    if not sites_data:
+        raise ValueError("No sites to export")
+
+    filename = f"cultural_sites_export_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+    await ctx.run_blocking(_write_sites_csv, filename, sites_data, ctx)
+    return {
+        "message": "Sites exported successfully",
+        "filename": filename,
+        "count": len(sites_data)
+    }
+
+
+@router.get("/export/csv", summary="Export sites to CSV", status_code=status.HTTP_202_ACCEPTED)
+async def export_sites_csv():
+    try:
+        job = await job_manager.submit("export_sites_csv")
+    except JobQueueFull:
+        raise HTTPException(status_code=503, detail="Job queue is full, try again later")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Export error: {e}")
+    return {
+        "message": "Export started",
+        "job_id": job["job_id"],
+        "status_url": f"/jobs/{job['job_id']}",
+        "result_url": f"/jobs/{job['job_id']}/result",
+    }
 
 # ✅ Health check
 @router.get("/health")
@@ -0,0 +1,132 @@
+# app/routes/sync.py
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from bson import ObjectId
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import func, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.core.config import settings
+from app.db.mongo import get_mongo_db
+from app.db.postgres import get_postgres_session
+from app.db.sync import MONGO_TOMBSTONES, decode_sync_token, encode_sync_token
+from app.models.artefact_model import Artefact
+from app.models.site_model import Site
+from app.models.tombstone_model import SyncTombstone
+
+router = APIRouter()
+
+# Rows are stamped with now(), i.e. when their transaction *started*, so a
+# transaction still open here can commit rows older than clock_timestamp().
+# The watermark is therefore held back to the start of the oldest open
+# client transaction in this database (as far as this role can see).
+WATERMARK_SQL = text(
+    """
+    SELECT LEAST(clock_timestamp(), min(xact_start))
+    FROM pg_stat_activity
+    WHERE datname = current_database()
+      AND backend_type = 'client backend'
+      AND pid <> pg_backend_pid()
+      AND xact_start IS NOT NULL
+    """
+)
+
+
+# Mongo watermark for a token issued while Mongo was down: forces a full
+# history reload on the next sync.
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def _serialize_history(doc: dict) -> dict:
+    doc["_id"] = str(doc["_id"])
+    return doc
+
+
+@router.get("/", summary="Changes since a sync token")
+async def sync_changes(
+    since: Optional[str] = None,
+    # Primary, not a replica: a lagging replica could hand out a watermark
+    # ahead of the data it has actually applied.
+    session: AsyncSession = Depends(get_postgres_session),
+    db=Depends(get_mongo_db),
+):
+    """
+    Return rows inserted/updated and tombstones for rows deleted since `since`.
+    Without a (valid, recent enough) token the response is a full snapshot
+    with "reset": true and the client should replace its cache. Rows changed
+    shortly before the token are re-sent, so clients must apply upserts
+    idempotently.
+
+    While MongoDB is unavailable, oral histories are left out of "changes"
+    and the token keeps the client's Mongo watermark. When a collection's
+    own watermark is too old, its entry carries "reset": true instead.
+    """
+    try:
+        pg_now = await session.scalar(WATERMARK_SQL)
+        mongo_now = datetime.now(timezone.utc)
+        retention = timedelta(days=settings.SYNC_TOMBSTONE_RETENTION_DAYS)
+        overlap = timedelta(seconds=settings.SYNC_OVERLAP_SECONDS)
+
+        cursor = decode_sync_token(since) if since else None
+        reset = cursor is None or cursor[0] < pg_now - retention
+        # Mongo tombstones expire on the same schedule (TTL index)
+        history_reset = reset or cursor[1] < mongo_now - retention
+
+        site_query = select(Site)
+        artefact_query = select(Artefact)
+        deletes = {"sites": [], "artefacts": [], "oral_histories": []}
+
+        if not reset:
+            pg_since = cursor[0] - overlap
+            site_query = site_query.where(func.coalesce(Site.updated_at, Site.created_at) > pg_since)
+            artefact_query = artefact_query.where(Artefact.updated_at > pg_since)
+
+            result = await session.execute(
+                select(SyncTombstone.collection, SyncTombstone.record_id)
+                .where(SyncTombstone.deleted_at > pg_since)
+            )
+            for collection, record_id in result.all():
+                if collection in ("sites", "artefacts"):
+                    deletes[collection].append(int(record_id))
+
+        sites = (await session.execute(site_query)).scalars().all()
+        artefacts = (await session.execute(artefact_query)).scalars().all()
+        changes = {
+            "sites": {"upserts": [s.to_dict() for s in sites], "deletes": deletes["sites"]},
+            "artefacts": {"upserts": [a.to_dict() for a in artefacts], "deletes": deletes["artefacts"]},
+        }
+
+        if db is None:
+            # Postgres lists still sync; histories catch up once Mongo is back
+            mongo_now = cursor[1] if cursor else EPOCH
+        else:
+            history_query = {}
+            if not history_reset:
+                mongo_since = cursor[1] - overlap
+                # Documents written before timestamps were stored fall back to the ObjectId time
+                history_query = {
+                    "$or": [
+                        {"updated_at": {"$gt": mongo_since}},
+                        {"updated_at": {"$exists": False}, "_id": {"$gt": ObjectId.from_datetime(mongo_since)}},
+                    ]
+                }
+                async for doc in db[MONGO_TOMBSTONES].find(
+                    {"collection": "oral_histories", "deleted_at": {"$gt": mongo_since}}
+                ):
+                    deletes["oral_histories"].append(doc["record_id"])
+            histories = [_serialize_history(doc) async for doc in db["oral_histories"].find(history_query)]
+            changes["oral_histories"] = {
+                "upserts": histories,
+                "deletes": deletes["oral_histories"],
+                "reset": history_reset,
+            }
+
+        return {
+            "token": encode_sync_token(pg_now, mongo_now),
+            "reset": reset,
+            "changes": changes,
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Sync error: {e}")
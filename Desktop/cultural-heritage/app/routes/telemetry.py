@@ -0,0 +1,125 @@
+# app/routes/telemetry.py
+import asyncio
+import math
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+import numpy as np
+from fastapi import APIRouter, HTTPException
+
+from app.core.config import settings
+from app.models.telemetry_model import TelemetryBatch
+from app.telemetry import TelemetryError, TooManyPoints, check_name, telemetry_store
+
+router = APIRouter()
+
+
+def _epoch_ms(value: datetime) -> int:
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return int(value.timestamp() * 1000)
+
+
+def _json_floats(values: np.ndarray) -> list:
+    # NaN/inf are not valid JSON
+    return [v if math.isfinite(v) else None for v in values.tolist()]
+
+
+def _append_columns(columns: dict[tuple[str, str], tuple[list, list]]):
+    for (node, metric), (ts, values) in columns.items():
+        telemetry_store.append(node, metric, np.array(ts, dtype=np.int64), np.array(values, dtype=np.float64))
+
+
+@router.post("/readings", summary="Append a batch of node readings")
+async def append_readings(batch: TelemetryBatch):
+    received = _epoch_ms(datetime.now(timezone.utc))
+    columns: dict[tuple[str, str], tuple[list, list]] = defaultdict(lambda: ([], []))
+    for reading in batch.readings:
+        ts = _epoch_ms(reading.ts) if reading.ts else received
+        for metric, value in reading.values.items():
+            if value is not None:
+                column = columns[(reading.node, metric)]
+                column[0].append(ts)
+                column[1].append(value)
+    try:
+        # Reject the whole batch up front rather than storing part of it
+        for node, metric in columns:
+            check_name(node)
+            check_name(metric)
+        # WAL writes (and directories for new series) are file I/O; keep them off the loop
+        await asyncio.to_thread(_append_columns, columns)
+    except TelemetryError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error storing telemetry: {e}")
+    return {"accepted": sum(len(ts) for ts, _ in columns.values()), "series": len(columns)}
+
+
+@router.get("/", summary="List telemetry series")
+async def list_series():
+    return telemetry_store.series()
+
+
+@router.get("/{node}/{metric}", summary="Readings for one node and metric")
+async def get_series(
+    node: str,
+    metric: str,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    step: Optional[float] = None,
+):
+    """
+    Raw points between `start` and `end` (default: the last hour), or with
+    `step` (seconds) the count/mean/min/max per bucket; steps that are
+    multiples of TELEMETRY_BLOCK_SECONDS are served mostly from block
+    summaries. Timestamps in the response are epoch milliseconds.
+    """
+    end_ms = _epoch_ms(end) if end else _epoch_ms(datetime.now(timezone.utc))
+    start_ms = _epoch_ms(start) if start else end_ms - int(timedelta(hours=1).total_seconds() * 1000)
+    if start_ms > end_ms:
+        raise HTTPException(status_code=400, detail="start must not be after end")
+    body = {"node": node, "metric": metric, "start": start_ms, "end": end_ms}
+
+    try:
+        if step is not None:
+            step_ms = int(step * 1000)
+            if step_ms <= 0:
+                raise HTTPException(status_code=400, detail="step must be positive")
+            if (end_ms - start_ms) // step_ms + 2 > settings.TELEMETRY_MAX_POINTS:
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"Too many buckets; use a step of at least "
+                           f"{math.ceil((end_ms - start_ms) / (settings.TELEMETRY_MAX_POINTS - 2) / 1000)} s",
+                )
+            try:
+                buckets = await asyncio.to_thread(
+                    telemetry_store.downsample, node, metric, start_ms, end_ms, step_ms,
+                    settings.TELEMETRY_MAX_DECODE_POINTS,
+                )
+            except TooManyPoints as e:
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"{e} to decode; use a step that is a multiple of "
+                           f"{settings.TELEMETRY_BLOCK_SECONDS} s or narrow the range",
+                )
+            return {
+                **body,
+                "step": step_ms,
+                "t": buckets["t"].tolist(),
+                "count": buckets["count"].tolist(),
+                "mean": _json_floats(buckets["mean"]),
+                "min": _json_floats(buckets["min"]),
+                "max": _json_floats(buckets["max"]),
+            }
+
+        ts, values = await asyncio.to_thread(
+            telemetry_store.read, node, metric, start_ms, end_ms, settings.TELEMETRY_MAX_POINTS
+        )
+        return {**body, "t": ts.tolist(), "v": _json_floats(values)}
+    except HTTPException:
+        raise
+    except TooManyPoints as e:
+        raise HTTPException(status_code=400, detail=f"{e}; narrow the range or pass a step")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error reading telemetry: {e}")
@@ -0,0 +1,8 @@
+# app/telemetry/__init__.py
+"""
+Local time-series storage for IoT mesh telemetry (Gorilla-compressed,
+memory-mapped segments).
+"""
+from app.telemetry.store import TelemetryError, TelemetryStore, TooManyPoints, check_name, telemetry_store
+
+__all__ = ["TelemetryError", "TelemetryStore", "TooManyPoints", "check_name", "telemetry_store"]
@@ -0,0 +1,146 @@
+# app/telemetry/gorilla.py
+"""
+Gorilla-style compression for one block of (timestamp, value) points.
+
+Timestamps (int64 ms) are stored as delta-of-delta with short prefix codes,
+so a steady 1 Hz stream costs one bit per point. Values (float64) are XORed
+with the previous value and only the meaningful bits are written, reusing
+the previous leading/trailing-zero window when it fits. Blocks are
+independent: the first point is stored raw, so any block can be decoded on
+its own.
+"""
+import numpy as np
+
+MASK64 = (1 << 64) - 1
+SIGN64 = 1 << 63
+
+
+class BitWriter:
+    def __init__(self):
+        self._out = bytearray()
+        self._acc = 0
+        self._bits = 0
+
+    def write(self, value: int, nbits: int):
+        self._acc = (self._acc << nbits) | value
+        self._bits += nbits
+        if self._bits >= 64:
+            spare = self._bits & 7
+            self._out += (self._acc >> spare).to_bytes(self._bits >> 3, "big")
+            self._acc &= (1 << spare) - 1
+            self._bits = spare
+
+    def getvalue(self) -> bytes:
+        pad = -self._bits & 7
+        tail = (self._acc << pad).to_bytes((self._bits + pad) >> 3, "big")
+        return bytes(self._out) + tail
+
+
+class BitReader:
+    def __init__(self, buf):
+        self._buf = buf
+        self.pos = 0
+
+    def read(self, nbits: int) -> int:
+        pos = self.pos
+        first = pos >> 3
+        nbytes = ((pos & 7) + nbits + 7) >> 3
+        chunk = int.from_bytes(self._buf[first:first + nbytes], "big")
+        self.pos = pos + nbits
+        return (chunk >> ((nbytes << 3) - (pos & 7) - nbits)) & ((1 << nbits) - 1)
+
+    def bit(self) -> int:
+        pos = self.pos
+        self.pos = pos + 1
+        return (self._buf[pos >> 3] >> (7 - (pos & 7))) & 1
+
+
+def encode_block(ts: np.ndarray, values: np.ndarray) -> bytes:
+    """
+    Compress parallel int64 timestamp / float64 value arrays (at least one point).
+    """
+    times = ts.astype(np.int64, copy=False).tolist()
+    bits = np.ascontiguousarray(values, dtype=np.float64).view(np.uint64).tolist()
+
+    w = BitWriter()
+    write = w.write
+    prev_t, prev_v = times[0], bits[0]
+    write(prev_t & MASK64, 64)
+    write(prev_v, 64)
+    prev_delta = 0
+    win_lead, win_trail = 64, 0  # no window yet: first non-zero XOR writes one
+
+    for t, v in zip(times[1:], bits[1:]):
+        delta = t - prev_t
+        dod = delta - prev_delta
+        if dod == 0:
+            write(0, 1)
+        elif -63 <= dod <= 64:
+            write((0b10 << 7) | (dod + 63), 9)
+        elif -255 <= dod <= 256:
+            write((0b110 << 9) | (dod + 255), 12)
+        elif -2047 <= dod <= 2048:
+            write((0b1110 << 12) | (dod + 2047), 16)
+        else:
+            write(0b1111, 4)
+            write(dod & MASK64, 64)
+        prev_t, prev_delta = t, delta
+
+        x = v ^ prev_v
+        if x == 0:
+            write(0, 1)
+        else:
+            lead = min(64 - x.bit_length(), 31)
+            trail = (x & -x).bit_length() - 1
+            if lead >= win_lead and trail >= win_trail:
+                write(0b10, 2)
+                write(x >> win_trail, 64 - win_lead - win_trail)
+            else:
+                sig = 64 - lead - trail
+                write((0b11 << 11) | (lead << 6) | (sig & 63), 13)
+                write(x >> trail, sig)
+                win_lead, win_trail = lead, trail
+        prev_v = v
+
+    return w.getvalue()
+
+
+def decode_block(buf, count: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Decode `count` points from a block produced by encode_block.
+    """
+    r = BitReader(buf)
+    read, bit = r.read, r.bit
+    t = read(64)
+    if t & SIGN64:
+        t -= 1 << 64
+    v = read(64)
+    times, bits = [t], [v]
+    delta = 0
+    lead = trail = 0
+
+    for _ in range(count - 1):
+        if not bit():
+            dod = 0
+        elif not bit():
+            dod = read(7) - 63
+        elif not bit():
+            dod = read(9) - 255
+        elif not bit():
+            dod = read(12) - 2047
+        else:
+            dod = read(64)
+            if dod & SIGN64:
+                dod -= 1 << 64
+        delta += dod
+        t += delta
+        times.append(t)
+
+        if bit():
+            if bit():
+                lead = read(5)
+                trail = 64 - lead - (read(6) or 64)
+            v ^= read(64 - lead - trail) << trail
+        bits.append(v)
+
+    return np.array(times, dtype=np.int64), np.array(bits, dtype=np.uint64).view(np.float64)
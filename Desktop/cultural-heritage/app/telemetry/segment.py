@@ -0,0 +1,152 @@
+# app/telemetry/segment.py
+"""
+Sealed segment files.
+
+A segment holds one (node, metric) series, sorted by time and split into
+independently compressed Gorilla blocks. Blocks are cut at epoch-aligned
+`block_ms` boundaries (and every `block_points` points), so a downsampling
+bucket that is a multiple of the block span never splits a block:
+
+    header (48 bytes) | block 0 | block 1 | ... | padding | block index
+
+The block index is a fixed-width record per block: time range, byte range,
+point count, and count/min/max/sum of the finite values. Segments are opened
+with mmap and the index is a NumPy view straight over the mapping, so
+opening a segment copies nothing and a range query only decodes the blocks
+it overlaps.
+"""
+import mmap
+import os
+import struct
+from pathlib import Path
+
+import numpy as np
+
+from app.telemetry.gorilla import decode_block, encode_block
+
+MAGIC = b"TSEG"
+VERSION = 1
+# magic, version, reserved, block count, point count, t_min, t_max, index offset
+HEADER = struct.Struct("<4sHHIQqqQ4x")
+
+BLOCK_DTYPE = np.dtype([
+    ("t_min", "<i8"),
+    ("t_max", "<i8"),
+    ("offset", "<u8"),
+    ("length", "<u4"),
+    ("count", "<u4"),
+    ("finite", "<u4"),
+    ("reserved", "<u4"),
+    ("v_min", "<f8"),
+    ("v_max", "<f8"),
+    ("v_sum", "<f8"),
+])
+
+
+class SegmentError(Exception):
+    pass
+
+
+def _block_ranges(ts: np.ndarray, block_ms: int, block_points: int) -> list[tuple[int, int]]:
+    cuts = (np.flatnonzero(np.diff(ts // block_ms)) + 1).tolist()
+    ranges = []
+    for first, last in zip([0] + cuts, cuts + [len(ts)]):
+        ranges += [(i, min(i + block_points, last)) for i in range(first, last, block_points)]
+    return ranges
+
+
+def write_segment(path: Path, ts: np.ndarray, values: np.ndarray, block_ms: int, block_points: int):
+    """
+    Compress a time-sorted series into a segment file. Written to a temp
+    file, fsynced and renamed into place, so readers never see a partial
+    segment.
+    """
+    count = len(ts)
+    if count == 0:
+        raise SegmentError("Cannot write an empty segment")
+    ranges = _block_ranges(ts, block_ms, block_points)
+    blocks = np.zeros(len(ranges), dtype=BLOCK_DTYPE)
+
+    tmp = path.with_suffix(".tmp")
+    with open(tmp, "wb") as f:
+        f.write(b"\0" * HEADER.size)
+        offset = HEADER.size
+        for i, (first, last) in enumerate(ranges):
+            t, v = ts[first:last], values[first:last]
+            data = encode_block(t, v)
+            f.write(data)
+            # NaN readings are stored but kept out of the block summaries
+            finite = v[np.isfinite(v)]
+            blocks[i] = (
+                t.min(), t.max(), offset, len(data), len(t), len(finite), 0,
+                finite.min() if len(finite) else np.nan,
+                finite.max() if len(finite) else np.nan,
+                finite.sum(),
+            )
+            offset += len(data)
+
+        pad = -offset & 7
+        f.write(b"\0" * pad)
+        index_offset = offset + pad
+        f.write(blocks.tobytes())
+        f.seek(0)
+        f.write(HEADER.pack(
+            MAGIC, VERSION, 0, len(blocks), count,
+            int(blocks["t_min"].min()), int(blocks["t_max"].max()), index_offset,
+        ))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+class Segment:
+    """
+    A read-only, memory-mapped segment.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.seq = int(path.stem)
+        try:
+            with open(path, "rb") as f:
+                self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            raise SegmentError(f"{path} is empty")
+        try:
+            magic, version, _, block_count, self.count, self.t_min, self.t_max, index_offset = (
+                HEADER.unpack_from(self._mm, 0)
+            )
+            if magic != MAGIC or version != VERSION:
+                raise SegmentError(f"{path} is not a v{VERSION} segment")
+            self.blocks = np.frombuffer(self._mm, dtype=BLOCK_DTYPE, count=block_count, offset=index_offset)
+            self._data = np.frombuffer(self._mm, dtype=np.uint8, count=index_offset)
+        except (struct.error, ValueError) as e:
+            self._mm.close()
+            raise SegmentError(f"{path} is truncated or corrupt: {e}")
+        except SegmentError:
+            self._mm.close()
+            raise
+
+    @property
+    def size(self) -> int:
+        return len(self._mm)
+
+    def overlapping(self, start: int, end: int) -> np.ndarray:
+        """
+        Indices of the blocks whose time range intersects [start, end].
+        """
+        blocks = self.blocks
+        return np.flatnonzero((blocks["t_max"] >= start) & (blocks["t_min"] <= end))
+
+    def decode(self, block: int) -> tuple[np.ndarray, np.ndarray]:
+        meta = self.blocks[block]
+        offset, length = int(meta["offset"]), int(meta["length"])
+        return decode_block(self._data[offset:offset + length].data, int(meta["count"]))
+
+    def close(self):
+        # Drop the views first: mmap refuses to close while buffers are exported
+        self.blocks = self._data = None
+        try:
+            self._mm.close()
+        except BufferError:
+            pass  # a query still holds a view; the mapping goes with it
@@ -0,0 +1,381 @@
+# app/telemetry/store.py
+"""
+Time-series store for IoT telemetry, one series per (node, metric).
+
+Appends land in an in-memory head and in a write-ahead log of raw 16-byte
+records, so a restart loses nothing. Once a head holds
+TELEMETRY_SEGMENT_POINTS points it is handed to a background thread that
+compresses it into a segment named after the WAL's sequence number; a WAL
+whose segment exists is obsolete and is removed. Sealed segments are indexed
+by time range, so a query only touches the segments (and the blocks within
+them) that overlap it.
+
+On disk: TELEMETRY_DIR/<node>/<metric>/<seq>.seg and head-<seq>.wal
+"""
+import itertools
+import logging
+import re
+import threading
+from array import array
+from bisect import bisect_left, bisect_right
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+from app.core.config import settings
+from app.telemetry.segment import Segment, SegmentError, write_segment
+
+logger = logging.getLogger("telemetry")
+
+NAME_PATTERN = re.compile(r"^[A-Za-z0-9][A-Za-z0-9_.-]{0,63}$")
+WAL_RECORD = np.dtype([("ts", "<i8"), ("value", "<f8")])
+
+
+class TelemetryError(Exception):
+    pass
+
+
+class TooManyPoints(TelemetryError):
+    def __init__(self, estimate: int):
+        super().__init__(f"Range holds up to {estimate} points")
+        self.estimate = estimate
+
+
+def _segment_path(directory: Path, seq: int) -> Path:
+    return directory / f"{seq:010d}.seg"
+
+
+def _wal_path(directory: Path, seq: int) -> Path:
+    return directory / f"head-{seq:010d}.wal"
+
+
+def _read_wal(path: Path) -> np.ndarray:
+    raw = path.read_bytes()
+    # A crash mid-write can leave a partial trailing record
+    return np.frombuffer(raw, dtype=WAL_RECORD, count=len(raw) // WAL_RECORD.itemsize)
+
+
+def check_name(name: str):
+    if not NAME_PATTERN.match(name):
+        raise TelemetryError(f"Invalid node or metric name '{name}'")
+
+
+class Series:
+    def __init__(self, directory: Path):
+        self.directory = directory
+        self.segments: list[Segment] = []  # ordered by t_min
+        self._starts: list[int] = []       # t_min of each segment
+        self._reach: list[int] = []        # running max of t_max
+        self.head_ts = array("q")
+        self.head_values = array("d")
+        # Heads handed to the sealer but not yet indexed; still visible to queries
+        self.pending: list[tuple[np.ndarray, np.ndarray]] = []
+        self.wal = None
+        self.wal_seq = 0  # sequence of the current head, and of the segment it becomes
+
+    def add_segment(self, segment: Segment):
+        i = bisect_right(self._starts, segment.t_min)
+        self.segments.insert(i, segment)
+        self._starts.insert(i, segment.t_min)
+        self._reach = list(itertools.accumulate((s.t_max for s in self.segments), max))
+
+    def overlapping(self, start: int, end: int) -> list[Segment]:
+        # Segments before `lo` all end before `start`; those from `hi` start after `end`
+        lo = bisect_left(self._reach, start)
+        hi = bisect_right(self._starts, end)
+        return [s for s in self.segments[lo:hi] if s.t_max >= start]
+
+    def head_snapshot(self) -> tuple[np.ndarray, np.ndarray]:
+        return np.array(self.head_ts, dtype=np.int64), np.array(self.head_values, dtype=np.float64)
+
+    def describe(self) -> dict:
+        sealed = sum(s.count for s in self.segments)
+        unsealed = len(self.head_ts) + sum(len(p[0]) for p in self.pending)
+        bounds = [(s.t_min, s.t_max) for s in self.segments]
+        bounds += [(int(t.min()), int(t.max())) for t, _ in self.pending if len(t)]
+        if self.head_ts:
+            bounds.append((min(self.head_ts), max(self.head_ts)))
+        return {
+            "points": sealed + unsealed,
+            "segments": len(self.segments),
+            "unsealed_points": unsealed,
+            "bytes": sum(s.size for s in self.segments),
+            "t_min": min((b[0] for b in bounds), default=None),
+            "t_max": max((b[1] for b in bounds), default=None),
+        }
+
+
+class TelemetryStore:
+    def __init__(self, root: str, segment_points: int, block_seconds: int, block_points: int):
+        self.root = Path(root)
+        self.segment_points = segment_points
+        self.block_ms = block_seconds * 1000
+        self.block_points = block_points
+        self._series: dict[tuple[str, str], Series] = {}
+        self._lock = threading.Lock()
+        self._sealer: Optional[ThreadPoolExecutor] = None
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+    def open(self):
+        """
+        Map existing segments, replay WALs and queue any unsealed full heads.
+        """
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._sealer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="telemetry-seal")
+        for directory in sorted(self.root.glob("*/*")):
+            node, metric = directory.parent.name, directory.name
+            if directory.is_dir() and NAME_PATTERN.match(node) and NAME_PATTERN.match(metric):
+                self._load_series(node, metric, directory)
+        logger.info(f"✅ Telemetry store opened ({len(self._series)} series).")
+
+    def _load_series(self, node: str, metric: str, directory: Path):
+        series = Series(directory)
+        for tmp in directory.glob("*.tmp"):
+            tmp.unlink()
+
+        sealed = set()
+        for path in directory.glob("*.seg"):
+            try:
+                segment = Segment(path)
+            except (SegmentError, ValueError) as e:
+                logger.error(f"❌ Skipping telemetry segment: {e}")
+                continue
+            series.add_segment(segment)
+            sealed.add(segment.seq)
+
+        wal_seqs = sorted(int(p.stem[len("head-"):]) for p in directory.glob("head-*.wal"))
+        latest = max(sealed | set(wal_seqs), default=-1)
+        series.wal_seq = latest + 1
+        stale = []
+        for seq in wal_seqs:
+            path = _wal_path(directory, seq)
+            if seq in sealed:
+                path.unlink()  # sealed just before the last shutdown
+                continue
+            records = _read_wal(path)
+            if seq == latest:
+                # Newest WAL is the head; keep appending to it
+                series.head_ts.frombytes(records["ts"].tobytes())
+                series.head_values.frombytes(records["value"].tobytes())
+                series.wal = open(path, "r+b")
+                series.wal.truncate(records.nbytes)
+                series.wal.seek(0, 2)
+                series.wal_seq = seq
+            elif len(records):
+                # An older head whose seal never completed
+                stale.append((seq, (records["ts"].copy(), records["value"].copy())))
+            else:
+                path.unlink()
+
+        with self._lock:
+            self._series[(node, metric)] = series
+            for seq, snapshot in stale:
+                series.pending.append(snapshot)
+                self._sealer.submit(self._seal, series, seq, snapshot)
+            if len(series.head_ts) >= self.segment_points:
+                self._start_seal(series)
+
+    def close(self):
+        """
+        Wait for in-flight seals, then close WALs and unmap segments. Unsealed
+        heads stay in their WALs for the next start.
+        """
+        if self._sealer is not None:
+            self._sealer.shutdown(wait=True)
+            self._sealer = None
+        with self._lock:
+            for series in self._series.values():
+                if series.wal is not None:
+                    series.wal.close()
+                    series.wal = None
+                for segment in series.segments:
+                    segment.close()
+            self._series.clear()
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+    def _get_or_create(self, node: str, metric: str) -> Series:
+        series = self._series.get((node, metric))
+        if series is None:
+            check_name(node)
+            check_name(metric)
+            directory = self.root / node / metric
+            directory.mkdir(parents=True, exist_ok=True)
+            series = self._series[(node, metric)] = Series(directory)
+        return series
+
+    def append(self, node: str, metric: str, ts: np.ndarray, values: np.ndarray):
+        """
+        Append points (epoch-ms timestamps, float values) to a series. Points
+        may arrive out of order; they are sorted when the head is sealed.
+        """
+        if self._sealer is None:
+            raise TelemetryError("Telemetry store is not open")
+        records = np.empty(len(ts), dtype=WAL_RECORD)
+        records["ts"], records["value"] = ts, values
+        with self._lock:
+            series = self._get_or_create(node, metric)
+            if series.wal is None:
+                series.wal = open(_wal_path(series.directory, series.wal_seq), "ab")
+            series.wal.write(records.tobytes())
+            series.wal.flush()
+            series.head_ts.frombytes(records["ts"].tobytes())
+            series.head_values.frombytes(records["value"].tobytes())
+            if len(series.head_ts) >= self.segment_points:
+                self._start_seal(series)
+
+    def _start_seal(self, series: Series):
+        # Called with the lock held: swap in an empty head and a fresh WAL
+        snapshot = series.head_snapshot()
+        seq = series.wal_seq
+        if series.wal is not None:
+            series.wal.close()
+            series.wal = None
+        series.wal_seq = seq + 1
+        series.head_ts, series.head_values = array("q"), array("d")
+        series.pending.append(snapshot)
+        self._sealer.submit(self._seal, series, seq, snapshot)
+
+    def _seal(self, series: Series, seq: int, snapshot: tuple[np.ndarray, np.ndarray]):
+        ts, values = snapshot
+        order = np.argsort(ts, kind="stable")
+        path = _segment_path(series.directory, seq)
+        try:
+            write_segment(path, ts[order], values[order], self.block_ms, self.block_points)
+            segment = Segment(path)
+        except (OSError, SegmentError) as e:
+            # Stays pending (and queryable); the WAL is replayed on the next start
+            logger.error(f"❌ Sealing {path} failed: {e}")
+            return
+        with self._lock:
+            series.add_segment(segment)
+            series.pending = [p for p in series.pending if p is not snapshot]
+        _wal_path(series.directory, seq).unlink(missing_ok=True)
+        logger.info(f"📦 Sealed {path} ({len(ts)} points, {segment.size} bytes).")
+
+    # ------------------------------------------------------------------
+    # Reads (blocking; run off the event loop)
+    # ------------------------------------------------------------------
+    def _sources(self, node: str, metric: str, start: int, end: int):
+        """
+        Overlapping segments plus copies of the unsealed points, taken under the lock.
+        """
+        with self._lock:
+            series = self._series.get((node, metric))
+            if series is None:
+                return [], []
+            return series.overlapping(start, end), series.pending + [series.head_snapshot()]
+
+    def read(self, node: str, metric: str, start: int, end: int, limit: Optional[int] = None):
+        """
+        Raw points in [start, end] as (timestamps, values), sorted by time.
+        Raises TooManyPoints before decoding anything when the overlapping
+        blocks hold more than `limit` points.
+        """
+        segments, unsealed = self._sources(node, metric, start, end)
+        touched = [(segment, segment.overlapping(start, end)) for segment in segments]
+        if limit is not None:
+            estimate = sum(int(s.blocks["count"][blocks].sum()) for s, blocks in touched)
+            estimate += sum(len(t) for t, _ in unsealed)
+            if estimate > limit:
+                raise TooManyPoints(estimate)
+
+        parts = [segment.decode(block) for segment, blocks in touched for block in blocks]
+        parts += unsealed
+        if not parts:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+        ts = np.concatenate([p[0] for p in parts])
+        values = np.concatenate([p[1] for p in parts])
+        keep = (ts >= start) & (ts <= end)
+        ts, values = ts[keep], values[keep]
+        if len(ts) > 1 and (np.diff(ts) < 0).any():
+            order = np.argsort(ts, kind="stable")
+            ts, values = ts[order], values[order]
+        return ts, values
+
+    def downsample(
+        self, node: str, metric: str, start: int, end: int, step: int, decode_limit: Optional[int] = None
+    ) -> dict:
+        """
+        Count/mean/min/max of the finite values per `step`-ms bucket, with
+        buckets aligned to multiples of `step` since the epoch. Blocks that
+        fall entirely inside one bucket are answered from their stored
+        summaries; only blocks straddling a bucket edge or the range ends are
+        decoded. Raises TooManyPoints before decoding anything when those
+        blocks hold more than `decode_limit` points.
+        """
+        origin = start - start % step
+        buckets = (end - origin) // step + 1
+        count = np.zeros(buckets, dtype=np.int64)
+        total = np.zeros(buckets)
+        low = np.full(buckets, np.inf)
+        high = np.full(buckets, -np.inf)
+
+        segments, decoded = self._sources(node, metric, start, end)
+        straddling = []
+        for segment in segments:
+            blocks = segment.overlapping(start, end)
+            meta = segment.blocks[blocks]
+            first = (meta["t_min"] - origin) // step
+            whole = (meta["t_min"] >= start) & (meta["t_max"] <= end) & (first == (meta["t_max"] - origin) // step)
+            summary, bucket = meta[whole], first[whole]
+            np.add.at(count, bucket, summary["finite"])
+            np.add.at(total, bucket, summary["v_sum"])
+            has_values = summary["finite"] > 0
+            np.minimum.at(low, bucket[has_values], summary["v_min"][has_values])
+            np.maximum.at(high, bucket[has_values], summary["v_max"][has_values])
+            straddling.append((segment, blocks[~whole]))
+
+        if decode_limit is not None:
+            estimate = sum(int(s.blocks["count"][blocks].sum()) for s, blocks in straddling)
+            if estimate > decode_limit:
+                raise TooManyPoints(estimate)
+        decoded += [segment.decode(block) for segment, blocks in straddling for block in blocks]
+
+        for ts, values in decoded:
+            keep = (ts >= start) & (ts <= end) & np.isfinite(values)
+            bucket, values = (ts[keep] - origin) // step, values[keep]
+            count += np.bincount(bucket, minlength=buckets)
+            total += np.bincount(bucket, weights=values, minlength=buckets)
+            np.minimum.at(low, bucket, values)
+            np.maximum.at(high, bucket, values)
+
+        filled = np.flatnonzero(count)
+        return {
+            "t": origin + filled * step,
+            "count": count[filled],
+            "mean": total[filled] / count[filled],
+            "min": low[filled],
+            "max": high[filled],
+        }
+
+    def series(self) -> list[dict]:
+        with self._lock:
+            return [
+                {"node": node, "metric": metric, **series.describe()}
+                for (node, metric), series in sorted(self._series.items())
+            ]
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "series": len(self._series),
+                "segments": sum(len(s.segments) for s in self._series.values()),
+                "bytes": sum(seg.size for s in self._series.values() for seg in s.segments),
+                "unsealed_points": sum(
+                    len(s.head_ts) + sum(len(p[0]) for p in s.pending) for s in self._series.values()
+                ),
+            }
+
+
+telemetry_store = TelemetryStore(
+    settings.TELEMETRY_DIR,
+    settings.TELEMETRY_SEGMENT_POINTS,
+    settings.TELEMETRY_BLOCK_SECONDS,
+    settings.TELEMETRY_BLOCK_POINTS,
+)
@@ -0,0 +1,147 @@
+# tests/test_admission.py
+import asyncio
+
+import pytest
+
+from app.core.admission import ConcurrencyLimiter, Overloaded, TokenBuckets, classify
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+async def settle():
+    # Let woken waiters run up to their next suspension point
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+def test_acquire_up_to_limit_without_waiting():
+    async def scenario():
+        limiter = ConcurrencyLimiter(limit=2, max_queue=4, budget=1.0)
+        await limiter.acquire()
+        await limiter.acquire()
+        assert limiter.active == 2
+    run(scenario())
+
+
+def test_release_hands_slot_to_waiter():
+    async def scenario():
+        limiter = ConcurrencyLimiter(limit=1, max_queue=4, budget=1.0)
+        await limiter.acquire()
+        waiter = asyncio.create_task(limiter.acquire())
+        await settle()
+        assert not waiter.done()
+
+        limiter.release(0.01)
+        await waiter
+        # The slot moved straight to the waiter
+        assert limiter.active == 1
+        limiter.release()
+        assert limiter.active == 0
+    run(scenario())
+
+
+def test_cancelled_waiter_leaves_queue():
+    async def scenario():
+        limiter = ConcurrencyLimiter(limit=1, max_queue=4, budget=1.0)
+        await limiter.acquire()
+        waiter = asyncio.create_task(limiter.acquire())
+        await settle()
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        assert len(limiter._waiters) == 0
+        limiter.release()
+        assert limiter.active == 0
+    run(scenario())
+
+
+@pytest.mark.parametrize("next_waiter", [False, True])
+def test_cancel_after_handoff_passes_the_slot_on(next_waiter):
+    async def scenario():
+        limiter = ConcurrencyLimiter(limit=1, max_queue=4, budget=1.0)
+        await limiter.acquire()
+        first = asyncio.create_task(limiter.acquire())
+        second = asyncio.create_task(limiter.acquire()) if next_waiter else None
+        await settle()
+
+        # Hand the slot to `first`, then cancel it before it resumes
+        limiter.release()
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+
+        if next_waiter:
+            await second
+            assert limiter.active == 1
+            limiter.release()
+        assert limiter.active == 0
+        assert len(limiter._waiters) == 0
+    run(scenario())
+
+
+def test_waiter_times_out_after_budget():
+    async def scenario():
+        limiter = ConcurrencyLimiter(limit=1, max_queue=4, budget=0.05)
+        limiter.service_time = 0.01  # keep the up-front estimate under budget
+        await limiter.acquire()
+        with pytest.raises(Overloaded):
+            await limiter.acquire()
+        assert len(limiter._waiters) == 0 and limiter.rejected == 1
+        limiter.release()
+        assert limiter.active == 0
+    run(scenario())
+
+
+def test_rejects_up_front_when_queue_is_full_or_over_budget():
+    async def scenario():
+        limiter = ConcurrencyLimiter(limit=1, max_queue=1, budget=1.0)
+        limiter.service_time = 0.01
+        await limiter.acquire()
+        waiter = asyncio.create_task(limiter.acquire())
+        await settle()
+        with pytest.raises(Overloaded):
+            await limiter.acquire()  # queue full
+
+        limiter.max_queue = 10
+        limiter.service_time = 5.0
+        with pytest.raises(Overloaded) as exc:
+            await limiter.acquire()  # estimated wait beyond budget
+        assert exc.value.retry_after > 1.0
+        assert limiter.rejected == 2
+
+        limiter.release()
+        await waiter
+    run(scenario())
+
+
+def test_token_bucket():
+    buckets = TokenBuckets(rate=1.0, burst=3.0)
+    assert buckets.take("a", 2.0) == 0
+    assert buckets.take("a", 1.0) == 0
+    assert buckets.take("a", 1.0) > 0
+    assert buckets.take("b", 3.0) == 0  # separate client, separate bucket
+
+
+def test_classify():
+    assert classify("GET", "/health") is None
+    assert classify("OPTIONS", "/sites/") is None
+    assert classify("GET", "/sites/") == "heavy"
+    assert classify("GET", "/sites/3") == "light"
+    assert classify("POST", "/sites/") == "write"
+    assert classify("GET", "/telemetry/thane/temp") == "heavy"
+
+
+def test_postgres_pool_covers_every_admitted_request():
+    from app.core.config import settings
+    from app.db.postgres import engine
+
+    admitted = (
+        settings.ADMISSION_HEAVY_CONCURRENCY
+        + settings.ADMISSION_LIGHT_CONCURRENCY
+        + settings.ADMISSION_WRITE_CONCURRENCY
+    )
+    # No overflow: requests past the limiter are shed there, not left waiting on the pool
+    assert engine.pool.size() == settings.POSTGRES_POOL_SIZE > admitted
+    assert engine.pool._max_overflow == 0
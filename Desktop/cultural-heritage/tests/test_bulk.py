@@ -0,0 +1,84 @@
+# tests/test_bulk.py
+import asyncio
+
+import pytest
+from pydantic import ValidationError
+from sqlalchemy.dialects import postgresql
+
+from app.db.bulk import BulkError, bulk_delete, bulk_update, build_where, clean_updates
+from app.models.bulk_model import BulkSelector
+from app.models.site_model import Site
+from app.routes.sites import FILTERABLE_FIELDS, UPDATABLE_FIELDS
+
+
+def sql(statement) -> str:
+    return str(statement.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+
+
+def where(ids=None, filters=None):
+    return [sql(c) for c in build_where(Site, Site.site_id, ids, filters, FILTERABLE_FIELDS)]
+
+
+def test_ids_and_filters_become_clauses():
+    assert where(ids=[1, 2], filters={"location_country": "India"}) == [
+        "heritage_sites.site_id IN (1, 2)",
+        "heritage_sites.location_country = 'India'",
+    ]
+
+
+def test_list_and_null_filters():
+    assert where(filters={"location_city": ["Pune", "Agra"], "name": None}) == [
+        "heritage_sites.location_city IN ('Pune', 'Agra')",
+        "heritage_sites.name IS NULL",
+    ]
+
+
+@pytest.mark.parametrize("ids, filters", [(None, None), (None, {})])
+def test_empty_selector_is_rejected(ids, filters):
+    with pytest.raises(BulkError):
+        where(ids, filters)
+
+
+def test_non_whitelisted_filter_is_rejected():
+    with pytest.raises(BulkError, match="description"):
+        where(filters={"description": "x"})
+
+
+def test_clean_updates():
+    assert clean_updates({"name": "Ajanta"}, UPDATABLE_FIELDS) == {"name": "Ajanta"}
+    with pytest.raises(BulkError, match="created_at, site_id"):
+        clean_updates({"site_id": 9, "created_at": None, "name": "x"}, UPDATABLE_FIELDS)
+
+
+def test_selector_caps_id_list():
+    BulkSelector(ids=list(range(1000)))
+    with pytest.raises(ValidationError):
+        BulkSelector(ids=list(range(1001)))
+
+
+class FakeSession:
+    def __init__(self):
+        self.statements = []
+
+    async def execute(self, statement):
+        self.statements.append(sql(statement))
+
+        class Result:
+            def scalars(self):
+                return self
+
+            def all(self):
+                return []
+        return Result()
+
+
+def test_bulk_statements_are_single_returning_statements():
+    session = FakeSession()
+    clauses = build_where(Site, Site.site_id, [3], None, FILTERABLE_FIELDS)
+    asyncio.run(bulk_update(session, Site, {"name": "Hampi"}, clauses))
+    asyncio.run(bulk_delete(session, Site, Site.site_id, clauses))
+
+    update_sql, delete_sql = session.statements
+    assert update_sql.startswith("UPDATE heritage_sites SET name='Hampi'")
+    assert "WHERE heritage_sites.site_id IN (3) RETURNING" in update_sql
+    assert delete_sql == "DELETE FROM heritage_sites WHERE heritage_sites.site_id IN (3) RETURNING heritage_sites.site_id"
@@ -0,0 +1,81 @@
+# tests/test_conditional.py
+from datetime import datetime, timedelta, timezone
+
+from fastapi import Request
+
+from app.core.conditional import CollectionVersions, Validators, collection_versions
+
+UPDATED = datetime(2026, 3, 1, 12, 0, 30, 500_000, tzinfo=timezone.utc)
+
+
+def make_request(**headers):
+    raw = [(name.replace("_", "-").encode(), value.encode()) for name, value in headers.items()]
+    return Request({"type": "http", "method": "GET", "headers": raw})
+
+
+def test_etag_depends_on_parts_and_collection():
+    a = Validators("sites", 3, UPDATED)
+    assert a.etag == Validators("sites", 3, UPDATED).etag
+    assert a.etag.startswith('W/"')
+    assert a.etag != Validators("sites", 4, UPDATED).etag
+    assert a.etag != Validators("artefacts", 3, UPDATED).etag
+
+
+def test_bump_changes_etag():
+    before = Validators("test-bump", 1).etag
+    collection_versions.bump("test-bump")
+    assert Validators("test-bump", 1).etag != before
+
+
+def test_versions_start_at_zero():
+    versions = CollectionVersions()
+    assert versions.get("sites") == 0
+    versions.bump("sites")
+    versions.bump("sites")
+    assert versions.get("sites") == 2
+
+
+def test_if_none_match():
+    v = Validators("sites", 3)
+    strong = v.etag.removeprefix("W/")
+    assert v.matches(make_request(if_none_match=v.etag))
+    assert v.matches(make_request(if_none_match=strong))  # weak comparison
+    assert v.matches(make_request(if_none_match=f'"other", {v.etag}'))
+    assert v.matches(make_request(if_none_match="*"))
+    assert not v.matches(make_request(if_none_match='W/"other"'))
+    assert not v.matches(make_request())
+
+
+def test_if_none_match_takes_precedence_over_if_modified_since():
+    v = Validators("sites", 3, last_modified=UPDATED)
+    request = make_request(if_none_match='W/"other"', if_modified_since=v.headers["Last-Modified"])
+    assert not v.matches(request)
+
+
+def test_if_modified_since_uses_second_precision():
+    v = Validators("sites", 1, last_modified=UPDATED)
+    assert v.headers["Last-Modified"] == "Sun, 01 Mar 2026 12:00:30 GMT"
+    assert v.matches(make_request(if_modified_since="Sun, 01 Mar 2026 12:00:30 GMT"))
+    assert not v.matches(make_request(if_modified_since="Sun, 01 Mar 2026 12:00:29 GMT"))
+    assert not v.matches(make_request(if_modified_since="yesterday"))
+
+
+def test_naive_last_modified_is_treated_as_utc():
+    v = Validators("sites", 1, last_modified=UPDATED.replace(tzinfo=None) + timedelta(seconds=1))
+    assert v.headers["Last-Modified"] == "Sun, 01 Mar 2026 12:00:31 GMT"
+    assert v.matches(make_request(if_modified_since="Sun, 01 Mar 2026 12:00:31 GMT"))
+
+
+def test_collection_validators_ignore_if_modified_since():
+    # Collection endpoints pass no last_modified (ETag only)
+    v = Validators("sites", 3, UPDATED)
+    assert "Last-Modified" not in v.headers
+    assert not v.matches(make_request(if_modified_since="Sun, 01 Mar 2030 00:00:00 GMT"))
+
+
+def test_not_modified_response_carries_validators():
+    v = Validators("sites", 1, last_modified=UPDATED)
+    response = v.not_modified()
+    assert response.status_code == 304
+    assert response.headers["etag"] == v.etag
+    assert response.headers["cache-control"] == "no-cache"
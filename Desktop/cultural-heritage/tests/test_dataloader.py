@@ -0,0 +1,113 @@
+# tests/test_dataloader.py
+import asyncio
+
+import pytest
+
+from app.core.dataloader import DataLoader
+from app.models.artefact_model import Artefact
+from app.models.site_model import Site
+from app.routes.sites import load_full_sites
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_loads_in_one_tick_share_a_batch():
+    async def scenario():
+        batches = []
+
+        async def batch(keys):
+            batches.append(keys)
+            return {k: k * 10 for k in keys if k != 3}
+
+        loader = DataLoader(batch)
+        results = await asyncio.gather(loader.load(1), loader.load(2), loader.load(1), loader.load(3))
+        assert results == [10, 20, 10, []]  # missing keys get default()
+        assert batches == [[1, 2, 3]]
+
+        # Cached for the loader's lifetime; new keys form a new batch
+        assert await loader.load_many([2, 4]) == [20, 40]
+        assert batches == [[1, 2, 3], [4]]
+    run(scenario())
+
+
+def test_failed_batch_fails_waiters_and_allows_retry():
+    async def scenario():
+        calls = []
+
+        async def batch(keys):
+            calls.append(keys)
+            if len(calls) == 1:
+                raise RuntimeError("store down")
+            return {k: k for k in keys}
+
+        loader = DataLoader(batch, default=lambda: None)
+        with pytest.raises(RuntimeError):
+            await loader.load_many(["a", "b"])
+        assert await loader.load("a") == "a"
+        assert calls == [["a", "b"], ["a"]]
+    run(scenario())
+
+
+class Result:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def scalars(self):
+        return self
+
+    def all(self):
+        return self.rows
+
+
+class FakeSession:
+    def __init__(self, sites, artefacts):
+        self.sites, self.artefacts = sites, artefacts
+        self.queries = 0
+
+    async def execute(self, statement):
+        self.queries += 1
+        table = statement.get_final_froms()[0].name
+        return Result(self.sites if table == Site.__tablename__ else self.artefacts)
+
+
+class FakeMongo:
+    def __init__(self, docs):
+        self.docs = docs
+        self.queries = []
+
+    def __getitem__(self, name):
+        return self
+
+    def find(self, query):
+        self.queries.append(query)
+
+        async def cursor():
+            for doc in self.docs:
+                if doc["region"] in query["region"]["$in"]:
+                    yield dict(doc)
+        return cursor()
+
+
+def test_full_sites_batch_lookups_and_dedupe_regions():
+    sites = [
+        Site(site_id=1, name="Gardens by the Bay", location_city="Singapore", location_country="Singapore"),
+        Site(site_id=2, name="Elephanta", location_city="Mumbai", location_country="India"),
+    ]
+    artefacts = [Artefact(artefact_id=5, name="Trimurti", site_name="Elephanta")]
+    session = FakeSession(sites, artefacts)
+    mongo = FakeMongo([
+        {"_id": "h1", "region": "Singapore"},
+        {"_id": "h2", "region": "India"},
+        {"_id": "h3", "region": "Mumbai"},
+    ])
+
+    full = run(load_full_sites([2, 1, 2], session, mongo))
+
+    assert [s["name"] for s in full] == ["Elephanta", "Gardens by the Bay"]
+    assert [a["name"] for a in full[0]["artefacts"]] == ["Trimurti"]
+    assert sorted(h["_id"] for h in full[0]["oral_histories"]) == ["h2", "h3"]
+    # City == country must not list the same histories twice
+    assert [h["_id"] for h in full[1]["oral_histories"]] == ["h1"]
+    assert session.queries == 2 and len(mongo.queries) == 1
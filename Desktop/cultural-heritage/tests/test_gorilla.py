@@ -0,0 +1,61 @@
+# tests/test_gorilla.py
+import numpy as np
+
+from app.telemetry.gorilla import decode_block, encode_block
+
+T0 = 1_790_000_000_000  # epoch ms
+
+
+def roundtrip(ts, values):
+    ts = np.asarray(ts, dtype=np.int64)
+    values = np.asarray(values, dtype=np.float64)
+    out_ts, out_values = decode_block(encode_block(ts, values), len(ts))
+    assert out_ts.dtype == np.int64 and out_values.dtype == np.float64
+    np.testing.assert_array_equal(out_ts, ts)
+    # Compare bit patterns so NaN payloads and -0.0 must survive too
+    np.testing.assert_array_equal(out_values.view(np.uint64), values.view(np.uint64))
+    return out_ts, out_values
+
+
+def test_single_point():
+    roundtrip([T0], [21.5])
+
+
+def test_noisy_series_with_jitter():
+    rng = np.random.default_rng(7)
+    n = 5000
+    ts = T0 + np.arange(n) * 1000 + rng.integers(-30, 30, n)
+    values = np.round(25 + np.sin(np.arange(n) / 300) * 5 + rng.normal(0, 0.3, n), 1)
+    roundtrip(ts, values)
+
+
+def test_special_floats():
+    values = [0.0, -0.0, np.nan, np.inf, -np.inf, 5e-324, -1.7976931348623157e308, np.nan, 1.0, 1.0]
+    roundtrip(T0 + np.arange(len(values)) * 1000, values)
+
+
+def test_nan_payload_is_preserved():
+    odd_nan = np.array([0x7FF8_0000_0000_1234], dtype=np.uint64).view(np.float64)
+    roundtrip([T0, T0 + 1000, T0 + 2000], [1.0, odd_nan[0], 2.0])
+
+
+def test_delta_of_delta_bucket_boundaries():
+    # Exercise every prefix code on both sides of its range
+    dods = [0, -63, 64, 65, -64, -255, 256, 257, -256, -2047, 2048, 2049, -2048]
+    deltas = 100_000 + np.cumsum([0] + dods)
+    ts = T0 + np.concatenate([[0], np.cumsum(deltas)])
+    roundtrip(ts, np.arange(len(ts), dtype=np.float64))
+
+
+def test_large_gaps_and_backwards_steps():
+    ts = [T0, T0 + 1000, T0 + 86_400_000 * 90, T0 - 5_000, 0, -T0, T0 + 10**13]
+    roundtrip(ts, np.linspace(-1, 1, len(ts)))
+
+
+def test_steady_series_compresses_to_about_two_bits_per_point():
+    n = 4096
+    ts = T0 + np.arange(n) * 1000
+    data = encode_block(ts, np.full(n, 41.0))
+    # 16 raw header bytes, then one bit each for the timestamp and the value
+    assert len(data) <= 16 + (2 * n) // 8 + 16
+    roundtrip(ts, np.full(n, 41.0))
@@ -0,0 +1,118 @@
+# tests/test_jobs.py
+import asyncio
+from types import SimpleNamespace
+
+from sqlalchemy.dialects import postgresql
+
+import app.core.jobs as jobs
+from app.core.jobs import JobManager
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def make_manager(monkeypatch, claimed=True, statuses=()):
+    """A JobManager whose Postgres calls are recorded instead of executed."""
+    monkeypatch.setattr(jobs.settings, "JOB_PROGRESS_FLUSH_SECONDS", 0.01)
+    manager = JobManager()
+    manager.updates = []
+    statuses = iter(statuses)
+
+    async def claim(job_id):
+        return SimpleNamespace(kind="demo", payload={"n": 1}) if claimed else None
+
+    async def heartbeat(job_id, ctx):
+        return next(statuses, "running")
+
+    async def update(job_id, **fields):
+        manager.updates.append(fields)
+
+    manager._claim, manager._heartbeat, manager._update = claim, heartbeat, update
+    return manager
+
+
+def test_unclaimed_job_is_not_run(monkeypatch):
+    manager = make_manager(monkeypatch, claimed=False)
+    calls = []
+
+    @manager.handler("demo")
+    async def demo(ctx, payload):
+        calls.append(payload)
+
+    run(manager._run("j1"))
+    assert calls == [] and manager.updates == []
+
+
+def test_claimed_job_succeeds(monkeypatch):
+    manager = make_manager(monkeypatch)
+
+    @manager.handler("demo")
+    async def demo(ctx, payload):
+        return {"n": payload["n"] + 1}
+
+    run(manager._run("j1"))
+    (final,) = manager.updates
+    assert final["status"] == "succeeded" and final["result"] == {"n": 2}
+    assert manager._running == {}
+
+
+def test_cancel_requested_by_another_process_stops_the_job(monkeypatch):
+    manager = make_manager(monkeypatch, statuses=["running", "cancelling"])
+
+    @manager.handler("demo")
+    async def demo(ctx, payload):
+        await asyncio.sleep(5)
+
+    run(asyncio.wait_for(manager._run("j1"), 2))
+    assert manager.updates[-1]["status"] == "cancelled"
+
+
+def test_submit_reserves_queue_slots(monkeypatch):
+    async def scenario():
+        manager = JobManager()
+        manager._queue = asyncio.PriorityQueue(maxsize=2)
+        manager.handler("demo")(lambda ctx, payload: None)
+
+        async def insert(kind, payload, priority):
+            await asyncio.sleep(0)
+            return SimpleNamespace(job_id=f"j{priority}", to_dict=lambda: {})
+        manager._insert = insert
+
+        results = await asyncio.gather(
+            *(manager.submit("demo", priority=i) for i in range(4)), return_exceptions=True
+        )
+        assert sum(isinstance(r, jobs.JobQueueFull) for r in results) == 2
+        assert manager._queue.qsize() == 2 and manager._reserved == 0
+    run(scenario())
+
+
+class FakeSession:
+    def __init__(self, row):
+        self.row = row
+        self.statements = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self, statement):
+        self.statements.append(str(statement.compile(dialect=postgresql.dialect())))
+        return SimpleNamespace(first=lambda: self.row)
+
+    async def commit(self):
+        pass
+
+
+def test_claim_only_takes_queued_rows_and_records_owner(monkeypatch):
+    session = FakeSession(row=None)
+    monkeypatch.setattr(jobs, "AsyncSessionLocal", lambda: session)
+    manager = JobManager()
+
+    assert run(manager._claim("j1")) is None
+    (sql,) = session.statements
+    assert sql.startswith("UPDATE background_jobs SET status=")
+    assert "owner=" in sql and "heartbeat_at=" in sql
+    assert "background_jobs.status = " in sql and "RETURNING" in sql
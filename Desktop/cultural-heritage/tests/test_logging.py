@@ -0,0 +1,87 @@
+# tests/test_logging.py
+import asyncio
+import json
+import logging
+import queue
+import sys
+
+from app.core.logging_config import (
+    DroppingQueueHandler,
+    JsonFormatter,
+    RequestIdFilter,
+    RequestIdMiddleware,
+    SamplingFilter,
+    request_id_var,
+)
+
+
+def make_record(name="app", level=logging.INFO, msg="hello %s", args=("world",), exc_info=None):
+    return logging.LogRecord(name, level, __file__, 1, msg, args, exc_info)
+
+
+def test_sampling_keeps_one_in_n_for_configured_loggers_and_children():
+    sampler = SamplingFilter({"uvicorn.access": 3, "noisy": 1})
+    kept = [sampler.filter(make_record("uvicorn.access.sub")) for _ in range(6)]
+    assert kept == [True, False, False, True, False, False]
+    assert sampler.sampled_out == 4
+    # Rate 1 and unconfigured loggers are never sampled
+    assert all(sampler.filter(make_record("noisy")) for _ in range(3))
+    assert all(sampler.filter(make_record("app")) for _ in range(3))
+
+
+def test_sampling_never_drops_warnings():
+    sampler = SamplingFilter({"uvicorn.access": 100})
+    sampler.filter(make_record("uvicorn.access"))
+    assert all(sampler.filter(make_record("uvicorn.access", logging.WARNING)) for _ in range(5))
+    assert sampler.sampled_out == 0
+
+
+def test_full_queue_drops_and_counts():
+    handler = DroppingQueueHandler(queue.Queue(maxsize=2))
+    for _ in range(5):
+        handler.handle(make_record())
+    assert handler.queue.qsize() == 2
+    assert handler.dropped == 3
+
+
+def test_prepared_record_is_formatted_as_json_with_request_id():
+    handler = DroppingQueueHandler(queue.Queue())
+    handler.addFilter(RequestIdFilter())
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        record = make_record(level=logging.ERROR, exc_info=sys.exc_info())
+    token = request_id_var.set("req-1")
+    try:
+        handler.handle(record)
+    finally:
+        request_id_var.reset(token)
+
+    queued = handler.queue.get_nowait()
+    assert queued.msg == "hello world" and queued.args is None and queued.exc_info is None
+    entry = json.loads(JsonFormatter().format(queued))
+    assert entry["msg"] == "hello world"
+    assert entry["level"] == "ERROR"
+    assert entry["request_id"] == "req-1"
+    assert "ValueError: boom" in entry["exc"]
+
+
+def test_middleware_echoes_or_generates_request_id():
+    async def app(scope, receive, send):
+        seen.append(request_id_var.get())
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+
+    async def call(headers):
+        sent = []
+
+        async def send(message):
+            sent.append(message)
+        await RequestIdMiddleware(app)({"type": "http", "headers": headers}, None, send)
+        return dict(sent[0]["headers"])[b"x-request-id"].decode()
+
+    seen = []
+    assert asyncio.run(call([(b"x-request-id", b"abc")])) == "abc"
+    generated = asyncio.run(call([]))
+    assert len(generated) == 16
+    assert seen == ["abc", generated]
+    assert request_id_var.get() is None
@@ -0,0 +1,103 @@
+# tests/test_replicas.py
+import asyncio
+import time
+from types import SimpleNamespace
+
+from fastapi import Request, Response
+
+import app.db.postgres as postgres
+from app.db.postgres import READ_YOUR_WRITES_COOKIE, ReplicaRouter, pinned_by_cookie
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def make_router(*healthy):
+    router = ReplicaRouter([])
+    router.replicas = [SimpleNamespace(name=f"r{i}", healthy=h) for i, h in enumerate(healthy)]
+    return router
+
+
+def make_request(method="GET", cookie=None):
+    headers = [(b"cookie", f"{READ_YOUR_WRITES_COOKIE}={cookie}".encode())] if cookie else []
+    return Request({"type": "http", "method": method, "headers": headers, "client": ("10.0.0.1", 1234)})
+
+
+def test_pick_round_robins_over_healthy_replicas():
+    router = make_router(True, False, True)
+    assert [router.pick().name for _ in range(4)] == ["r0", "r2", "r2", "r0"]
+
+
+def test_pick_falls_back_to_primary():
+    assert make_router(False, False).pick() is None
+    assert make_router().pick() is None
+
+
+def test_pinned_client_reads_from_primary_until_expiry(monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr(postgres.time, "monotonic", lambda: clock[0])
+    router = make_router(True)
+
+    router.pin_to_primary("client-a")
+    assert router.is_pinned("client-a")
+    assert router.pick("client-a") is None
+    assert router.pick("client-b").name == "r0"
+
+    clock[0] += postgres.settings.READ_YOUR_WRITES_SECONDS + 0.1
+    assert not router.is_pinned("client-a")
+    assert "client-a" not in router._pinned
+    assert router.pick("client-a").name == "r0"
+
+
+def test_no_pinning_without_replicas():
+    router = make_router()
+    router.pin_to_primary("client-a")
+    assert not router.is_pinned("client-a")
+    assert not router.is_pinned(None)
+
+
+def test_pinned_table_is_pruned_when_full(monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr(postgres.time, "monotonic", lambda: clock[0])
+    monkeypatch.setattr(ReplicaRouter, "MAX_PINNED_CLIENTS", 2)
+    router = make_router(True)
+    router.pin_to_primary("a")
+    router.pin_to_primary("b")
+    clock[0] += postgres.settings.READ_YOUR_WRITES_SECONDS + 0.1
+    router.pin_to_primary("c")
+    assert list(router._pinned) == ["c"]
+
+
+def test_cookie_pin_is_bounded_by_the_window():
+    window = postgres.settings.READ_YOUR_WRITES_SECONDS
+    now = time.time()
+    assert pinned_by_cookie(make_request(cookie=f"{now + window / 2:.3f}"))
+    assert not pinned_by_cookie(make_request(cookie=f"{now - 1:.3f}"))
+    assert not pinned_by_cookie(make_request(cookie=f"{now + window * 10:.3f}"))
+    assert not pinned_by_cookie(make_request(cookie="soon"))
+    assert not pinned_by_cookie(make_request())
+
+
+def test_write_sets_cookie_that_keeps_reads_on_primary(monkeypatch):
+    def replica_session():
+        raise AssertionError("read went to the replica")
+
+    router = make_router(True)
+    router.replicas[0].session_factory = replica_session
+    monkeypatch.setattr(postgres, "replica_router", router)
+
+    async def scenario():
+        response = Response()
+        session_dep = postgres.get_postgres_session(make_request("POST"), response)
+        await session_dep.__anext__()
+        await session_dep.aclose()
+        cookie = response.headers["set-cookie"]
+        assert cookie.startswith(f"{READ_YOUR_WRITES_COOKIE}=") and "HttpOnly" in cookie
+
+        # Another process has no in-memory pin, only the cookie
+        router._pinned.clear()
+        value = cookie.split(";")[0].split("=")[1]
+        async with postgres.read_session(make_request(cookie=value)) as session:
+            assert not isinstance(session, postgres.ReplicaSession)
+    run(scenario())
@@ -0,0 +1,141 @@
+# tests/test_security.py
+import asyncio
+import hashlib
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+import app.core.security as security
+from app.core.security import (
+    TokenAuthMiddleware,
+    TokenVerifier,
+    create_session_token,
+    hash_password,
+    needs_rehash,
+    verify_password,
+)
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_password_round_trip():
+    async def scenario():
+        stored = await hash_password("s3cret")
+        assert stored.startswith("scrypt$")
+        assert not needs_rehash(stored)
+        assert await verify_password("s3cret", stored)
+        assert not await verify_password("wrong", stored)
+    run(scenario())
+
+
+def test_legacy_sha256_hash_verifies_and_needs_rehash():
+    async def scenario():
+        legacy = hashlib.sha256(b"old").hexdigest()
+        assert needs_rehash(legacy)
+        assert await verify_password("old", legacy)
+        assert not await verify_password("new", legacy)
+    run(scenario())
+
+
+def test_unknown_user_never_verifies():
+    assert not run(verify_password("anything", None))
+
+
+def test_token_round_trip():
+    token, expires_at = create_session_token(7, "asha", True)
+    claims = TokenVerifier(8).verify(token)
+    assert claims["uid"] == 7 and claims["sub"] == "asha" and claims["adm"] is True
+    assert claims["exp"] == expires_at
+
+
+@pytest.mark.parametrize("token", [
+    "",
+    "no-signature",
+    "abc.def",
+    "abc.d\xe9f",  # non-ASCII must be rejected, not raise
+    "\xff\xfe.\xe9",
+])
+def test_malformed_tokens_are_rejected(token):
+    assert TokenVerifier(8).verify(token) is None
+
+
+def test_tampered_payload_is_rejected():
+    token, _ = create_session_token(1, "asha", False)
+    other, _ = create_session_token(1, "asha", True)
+    forged = other.partition(".")[0] + "." + token.partition(".")[2]
+    assert TokenVerifier(8).verify(forged) is None
+
+
+def test_expired_token_is_rejected_even_when_cached(monkeypatch):
+    verifier = TokenVerifier(8)
+    token, expires_at = create_session_token(1, "asha", False)
+    assert verifier.verify(token)
+    monkeypatch.setattr(security.time, "time", lambda: expires_at + 1)
+    assert verifier.verify(token) is None
+    assert token not in verifier._cache
+
+
+def test_cache_is_bounded():
+    verifier = TokenVerifier(2)
+    tokens = [create_session_token(i, f"u{i}", False)[0] for i in range(3)]
+    for token in tokens:
+        assert verifier.verify(token)
+    assert list(verifier._cache) == tokens[1:]
+
+
+class FakeSession:
+    def __init__(self):
+        self.statements = []
+        self.committed = False
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self, statement):
+        self.statements.append(statement)
+
+    async def commit(self):
+        self.committed = True
+
+
+def test_revoke_rejects_token_and_records_it_idempotently(monkeypatch):
+    session = FakeSession()
+    monkeypatch.setattr(security, "AsyncSessionLocal", lambda: session)
+    verifier = TokenVerifier(8)
+    token, _ = create_session_token(1, "asha", False)
+    claims = verifier.verify(token)
+
+    run(verifier.revoke(claims))
+    assert verifier.verify(token) is None
+    assert session.committed
+    (statement,) = session.statements
+    # A second logout of the same token (e.g. on another worker) must not fail
+    assert "ON CONFLICT (jti) DO NOTHING" in str(statement.compile(dialect=postgresql.dialect()))
+
+
+def test_middleware_ignores_non_ascii_authorization_header():
+    seen = {}
+
+    async def app(scope, receive, send):
+        seen["user"] = scope["state"]["user"]
+
+    scope = {"type": "http", "headers": [(b"authorization", b"Bearer abc.d\xe9f")]}
+    run(TokenAuthMiddleware(app)(scope, None, None))
+    assert seen["user"] is None
+
+
+def test_middleware_attaches_claims():
+    seen = {}
+
+    async def app(scope, receive, send):
+        seen["user"] = scope["state"]["user"]
+
+    token, _ = create_session_token(3, "ravi", False)
+    scope = {"type": "http", "headers": [(b"authorization", f"Bearer {token}".encode())]}
+    run(TokenAuthMiddleware(app)(scope, None, None))
+    assert seen["user"]["sub"] == "ravi"
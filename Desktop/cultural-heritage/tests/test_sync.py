@@ -0,0 +1,107 @@
+# tests/test_sync.py
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+from app.db.sync import decode_sync_token, encode_sync_token
+from app.models.artefact_model import Artefact
+from app.models.site_model import Site
+from app.routes.sync import EPOCH, sync_changes
+
+NOW = datetime(2026, 3, 1, 12, 0, tzinfo=timezone.utc)
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_token_round_trip():
+    mongo = NOW - timedelta(seconds=5)
+    assert decode_sync_token(encode_sync_token(NOW, mongo)) == (NOW, mongo)
+
+
+def test_bad_tokens_decode_to_none():
+    naive = encode_sync_token(NOW.replace(tzinfo=None), NOW)
+    for token in ["", "not-base64!", "e30", naive]:
+        assert decode_sync_token(token) is None
+
+
+class Result:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def all(self):
+        return self.rows
+
+    def scalars(self):
+        return self
+
+
+class FakeSession:
+    """Answers the watermark, tombstone and table queries of sync_changes."""
+
+    def __init__(self, sites=(), artefacts=(), tombstones=()):
+        self.tables = {
+            Site.__tablename__: list(sites),
+            Artefact.__tablename__: list(artefacts),
+            "sync_tombstones": list(tombstones),
+        }
+
+    async def scalar(self, statement):
+        return NOW
+
+    async def execute(self, statement):
+        return Result(self.tables[statement.get_final_froms()[0].name])
+
+
+def test_sync_without_mongo_still_returns_postgres_changes():
+    session = FakeSession(
+        sites=[Site(site_id=1, name="Elephanta")],
+        artefacts=[Artefact(artefact_id=2, name="Trimurti")],
+    )
+    body = run(sync_changes(since=None, session=session, db=None))
+
+    assert body["reset"] is True
+    assert [s["name"] for s in body["changes"]["sites"]["upserts"]] == ["Elephanta"]
+    assert len(body["changes"]["artefacts"]["upserts"]) == 1
+    assert "oral_histories" not in body["changes"]
+    # No Mongo watermark yet: the next sync reloads all histories
+    assert decode_sync_token(body["token"]) == (NOW, EPOCH)
+
+
+def test_sync_without_mongo_keeps_incoming_mongo_watermark():
+    mongo_since = NOW - timedelta(minutes=3)
+    session = FakeSession(tombstones=[("sites", "4"), ("oral_histories", "abc")])
+    body = run(sync_changes(
+        since=encode_sync_token(NOW - timedelta(minutes=1), mongo_since), session=session, db=None,
+    ))
+
+    assert body["reset"] is False
+    assert body["changes"]["sites"]["deletes"] == [4]
+    assert decode_sync_token(body["token"]) == (NOW, mongo_since)
+
+
+class FakeCollection:
+    def __init__(self, docs):
+        self.docs = docs
+        self.queries = []
+
+    def find(self, query):
+        self.queries.append(query)
+
+        async def cursor():
+            for doc in self.docs:
+                yield dict(doc)
+        return cursor()
+
+
+def test_stale_mongo_watermark_resets_only_histories():
+    histories = FakeCollection([{"_id": "h1", "region": "Mumbai"}])
+    db = {"oral_histories": histories, "sync_tombstones": FakeCollection([])}
+    body = run(sync_changes(
+        since=encode_sync_token(NOW - timedelta(minutes=1), EPOCH), session=FakeSession(), db=db,
+    ))
+
+    assert body["reset"] is False
+    assert body["changes"]["oral_histories"]["reset"] is True
+    assert histories.queries == [{}]
+    assert [h["_id"] for h in body["changes"]["oral_histories"]["upserts"]] == ["h1"]
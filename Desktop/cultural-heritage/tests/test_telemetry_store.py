@@ -0,0 +1,235 @@
+# tests/test_telemetry_store.py
+import numpy as np
+import pytest
+
+from app.telemetry.segment import Segment, SegmentError, write_segment
+from app.telemetry.store import WAL_RECORD, TelemetryError, TelemetryStore, TooManyPoints
+
+T0 = 1_790_000_100_000  # epoch ms, on a 15-minute boundary
+MINUTE = 60_000
+
+
+def series(n, start=T0, every=1000, seed=0):
+    rng = np.random.default_rng(seed)
+    ts = start + np.arange(n, dtype=np.int64) * every
+    values = np.round(20 + rng.normal(0, 1, n), 2)
+    return ts, values
+
+
+def wait_for_seals(store):
+    store._sealer.submit(lambda: None).result()
+
+
+@pytest.fixture
+def store(tmp_path):
+    s = TelemetryStore(str(tmp_path), segment_points=1000, block_seconds=60, block_points=100)
+    s.open()
+    yield s
+    s.close()
+
+
+def reopen(store):
+    store.close()
+    s = TelemetryStore(str(store.root), store.segment_points, store.block_ms // 1000, store.block_points)
+    s.open()
+    return s
+
+
+# ----------------------------------------------------------------------
+# Segments
+# ----------------------------------------------------------------------
+def test_segment_roundtrip_and_block_index(tmp_path):
+    ts, values = series(1000, every=250)
+    path = tmp_path / "0000000000.seg"
+    write_segment(path, ts, values, block_ms=MINUTE, block_points=100)
+    segment = Segment(path)
+    try:
+        assert (segment.count, segment.t_min, segment.t_max) == (1000, ts[0], ts[-1])
+        # The index is a view over the mapping, not a copy
+        assert not segment.blocks.flags.owndata
+        # Cut every 100 points and at every minute boundary (240 points/minute)
+        assert segment.blocks["count"].max() <= 100
+        assert (segment.blocks["t_min"] // MINUTE == segment.blocks["t_max"] // MINUTE).all()
+
+        decoded = [segment.decode(i) for i in range(len(segment.blocks))]
+        np.testing.assert_array_equal(np.concatenate([d[0] for d in decoded]), ts)
+        np.testing.assert_array_equal(np.concatenate([d[1] for d in decoded]), values)
+
+        blocks = segment.blocks
+        np.testing.assert_allclose(blocks["v_sum"].sum(), values.sum())
+        assert blocks["v_min"].min() == values.min() and blocks["v_max"].max() == values.max()
+
+        hit = segment.overlapping(int(ts[300]), int(ts[310]))
+        assert 0 < len(hit) <= 2
+        assert (blocks["t_max"][hit] >= ts[300]).all() and (blocks["t_min"][hit] <= ts[310]).all()
+    finally:
+        segment.close()
+
+
+def test_segment_summaries_skip_nan(tmp_path):
+    ts, values = series(10)
+    values[3] = np.nan
+    path = tmp_path / "0000000000.seg"
+    write_segment(path, ts, values, block_ms=MINUTE, block_points=100)
+    segment = Segment(path)
+    try:
+        block = segment.blocks[0]
+        assert block["count"] == 10 and block["finite"] == 9
+        np.testing.assert_allclose(block["v_sum"], np.nansum(values))
+    finally:
+        segment.close()
+
+
+@pytest.mark.parametrize("content", [b"", b"TSEG\x01", b"XXXX" + b"\0" * 60])
+def test_bad_segment_files_are_rejected(tmp_path, content):
+    path = tmp_path / "0000000000.seg"
+    path.write_bytes(content)
+    with pytest.raises(SegmentError):
+        Segment(path)
+
+
+# ----------------------------------------------------------------------
+# Store: appends, sealing, queries
+# ----------------------------------------------------------------------
+def test_append_seals_full_heads(store):
+    ts, values = series(2500)
+    for i in range(0, 2500, 500):
+        store.append("thane", "temp", ts[i:i + 500], values[i:i + 500])
+    wait_for_seals(store)
+
+    directory = store.root / "thane" / "temp"
+    assert sorted(p.name for p in directory.iterdir()) == [
+        "0000000000.seg", "0000000001.seg", "head-0000000002.wal",
+    ]
+    info = store.series()[0]
+    assert info["points"] == 2500 and info["segments"] == 2 and info["unsealed_points"] == 500
+
+    out_ts, out_values = store.read("thane", "temp", 0, 2**62)
+    np.testing.assert_array_equal(out_ts, ts)
+    np.testing.assert_array_equal(out_values, values)
+
+
+def test_read_range_and_out_of_order_points(store):
+    ts, values = series(1500)
+    store.append("thane", "soil", ts[::-1], values[::-1])
+    wait_for_seals(store)
+
+    out_ts, out_values = store.read("thane", "soil", int(ts[100]), int(ts[1200]))
+    np.testing.assert_array_equal(out_ts, ts[100:1201])
+    np.testing.assert_array_equal(out_values, values[100:1201])
+
+    empty_ts, _ = store.read("thane", "missing", 0, 2**62)
+    assert len(empty_ts) == 0
+
+
+def test_read_limit(store):
+    ts, values = series(1500)
+    store.append("thane", "wind", ts, values)
+    wait_for_seals(store)
+    with pytest.raises(TooManyPoints):
+        store.read("thane", "wind", 0, 2**62, limit=100)
+    # The estimate only counts overlapping blocks
+    assert len(store.read("thane", "wind", int(ts[0]), int(ts[10]), limit=200)[0]) == 11
+
+
+@pytest.mark.parametrize("step", [MINUTE, 2 * MINUTE, 7_000, 10**12])
+def test_downsample_matches_brute_force(store, step):
+    ts, values = series(3300, every=700, seed=3)
+    values[::97] = np.nan
+    store.append("navi", "humidity", ts, values)
+    wait_for_seals(store)
+
+    start, end = int(ts[123]), int(ts[3000])
+    result = store.downsample("navi", "humidity", start, end, step)
+
+    origin = start - start % step
+    keep = (ts >= start) & (ts <= end) & np.isfinite(values)
+    buckets = (ts[keep] - origin) // step
+    expected = np.unique(buckets)
+    np.testing.assert_array_equal(result["t"], origin + expected * step)
+    for i, bucket in enumerate(expected):
+        x = values[keep][buckets == bucket]
+        assert result["count"][i] == len(x)
+        assert result["min"][i] == x.min() and result["max"][i] == x.max()
+        assert result["mean"][i] == pytest.approx(x.mean())
+
+
+def test_downsample_decode_limit(store):
+    ts, values = series(3000)
+    store.append("navi", "temp", ts, values)
+    wait_for_seals(store)
+    start, end = int(ts[0]), int(ts[1799])  # both on minute boundaries
+    # Block-aligned steps are answered from summaries and decode nothing
+    store.downsample("navi", "temp", start, end, MINUTE, decode_limit=0)
+    with pytest.raises(TooManyPoints):
+        store.downsample("navi", "temp", start, end, 7_000, decode_limit=100)
+
+
+def test_invalid_names_are_rejected(store):
+    with pytest.raises(TelemetryError):
+        store.append("../etc", "temp", np.array([T0]), np.array([1.0]))
+
+
+# ----------------------------------------------------------------------
+# Recovery
+# ----------------------------------------------------------------------
+def test_reopen_replays_head_wal(store):
+    ts, values = series(1200)
+    store.append("thane", "temp", ts, values)
+    wait_for_seals(store)
+    store = reopen(store)
+    try:
+        store.append("thane", "temp", np.array([ts[-1] + 1000]), np.array([99.0]))
+        out_ts, out_values = store.read("thane", "temp", 0, 2**62)
+        assert len(out_ts) == 1201 and out_values[-1] == 99.0
+        assert store.stats()["segments"] == 1
+    finally:
+        store.close()
+
+
+def test_partial_wal_record_is_dropped(store):
+    ts, values = series(10)
+    store.append("thane", "temp", ts, values)
+    store.close()
+    wal = store.root / "thane" / "temp" / "head-0000000000.wal"
+    with open(wal, "ab") as f:
+        f.write(b"\x01\x02\x03")  # torn write
+    store = reopen(store)
+    try:
+        out_ts, _ = store.read("thane", "temp", 0, 2**62)
+        np.testing.assert_array_equal(out_ts, ts)
+        assert wal.stat().st_size == 10 * WAL_RECORD.itemsize
+    finally:
+        store.close()
+
+
+def test_recovery_of_stale_and_unsealed_wals(tmp_path):
+    directory = tmp_path / "node1" / "soil"
+    directory.mkdir(parents=True)
+
+    def wal(seq, ts):
+        records = np.zeros(len(ts), dtype=WAL_RECORD)
+        records["ts"], records["value"] = ts, np.arange(len(ts))
+        records.tofile(directory / f"head-{seq:010d}.wal")
+
+    # Segment 0 was sealed but its WAL not yet removed
+    ts0, values0 = series(50)
+    write_segment(directory / "0000000000.seg", ts0, values0, block_ms=MINUTE, block_points=100)
+    wal(0, ts0)
+    # WAL 1 lost its seal (crash or failed write); WAL 2 is the live head
+    wal(1, T0 + 10**6 + np.arange(20) * 1000)
+    wal(2, T0 + 10**7 + np.arange(5) * 1000)
+    (directory / "0000000003.tmp").write_bytes(b"partial")
+
+    store = TelemetryStore(str(tmp_path), segment_points=1000, block_seconds=60, block_points=100)
+    store.open()
+    try:
+        wait_for_seals(store)
+        assert sorted(p.name for p in directory.iterdir()) == [
+            "0000000000.seg", "0000000001.seg", "head-0000000002.wal",
+        ]
+        out_ts, _ = store.read("node1", "soil", 0, 2**62)
+        assert len(out_ts) == 50 + 20 + 5
+        assert store.stats()["unsealed_points"] == 5
+    finally:
+        store.close()